@@ -2,27 +2,52 @@
 
 from __future__ import annotations
 
-import secrets
-import re
+import asyncio
 import time
 from datetime import UTC, datetime
-from typing import Any
+from typing import Annotated, Any, Mapping, TypeVar
 
+import orjson
 from fastapi import APIRouter, HTTPException, Request, Form, Response
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel, Field, ValidationError, field_validator
+from fastapi.responses import HTMLResponse, ORJSONResponse
+from pydantic import AfterValidator, BaseModel, Field, ValidationError, field_validator
 
 from app.authz import storage
-from app.paths import TEMPLATES_DIR
+from app.common.web import TEMPLATES
+from app.lib import hyperliquid_adapter
+from app.lib.ids import next_id
 from app.authz.view_models import agent_summary_view, agent_vault_view
 
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 router = APIRouter()
 
+_MAX_JSON_BODY_BYTES = 64_000
 
-_WALLET_ADDRESS_RE = re.compile(r"^0x[a-fA-F0-9]{40}$")
-_AGENT_ADDRESS_RE = _WALLET_ADDRESS_RE
+# HTMX partials below never reference `request`, so they render straight from
+# the compiled templates instead of going through TemplateResponse.
+_AGENT_LIST_TEMPLATE = TEMPLATES.get_template("authz/_agent_list.html")
+_AGENT_STATUS_TEMPLATE = TEMPLATES.get_template("authz/agent_status.html")
+
+
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+
+def _is_evm_address(value: str | None) -> bool:
+    """Return whether value is a 0x-prefixed string of exactly 40 hex digits."""
+
+    if not value or len(value) != 42 or not value.startswith("0x"):
+        return False
+    # An explicit digit set, unlike int(..., 16), rejects a second "0x", underscores,
+    # and non-ASCII digits.
+    return set(value[2:]) <= _HEX_DIGITS
+
+
+def _validate_agent_address(value: str) -> str:
+    if not _is_evm_address(value):
+        raise ValueError("Agent address must be 0x-prefixed (40 bytes).")
+    return value.lower()
+
+
+AgentAddress = Annotated[str, AfterValidator(_validate_agent_address)]
 
 
 class WalletSessionPayload(BaseModel):
@@ -35,34 +60,21 @@ class WalletSessionPayload(BaseModel):
     def validate_evm_address(cls, value: str) -> str:
         """Ensure the value is a 0x-prefixed 40 byte hexadecimal string."""
 
-        if not _WALLET_ADDRESS_RE.fullmatch(value or ""):
+        if not _is_evm_address(value):
             raise ValueError("Must be a 0x-prefixed hexadecimal address (40 bytes).")
         return value.lower()
 
 
-class WalletSessionResponse(BaseModel):
-    """Response envelope data for wallet session endpoints."""
-
-    address: str | None
-
-
 class AgentRegistrationPayload(BaseModel):
     """Payload for registering an agent wallet and encrypted secret."""
 
     label: str = Field(..., min_length=1, max_length=64)
-    agent_address: str = Field(..., description="0x-prefixed agent wallet address")
+    agent_address: AgentAddress = Field(..., description="0x-prefixed agent wallet address")
     private_key: str = Field(..., description="Hex-encoded agent private key")
 
     # owner_wallet supplied by handler, not exposed to clients directly
     owner_wallet: str | None = Field(default=None, exclude=True)
 
-    @field_validator("agent_address")
-    @classmethod
-    def validate_agent_address(cls, value: str) -> str:
-        if not _AGENT_ADDRESS_RE.fullmatch(value or ""):
-            raise ValueError("Agent address must be 0x-prefixed (40 bytes).")
-        return value.lower()
-
     @field_validator("private_key")
     @classmethod
     def validate_private_key(cls, value: str) -> str:
@@ -72,24 +84,6 @@ class AgentRegistrationPayload(BaseModel):
         return key
 
 
-class AgentRegistrationResponse(BaseModel):
-    """Response data for agent registration."""
-
-    agent_address: str
-    label: str
-    stored_at: float
-    owner_wallet: str
-
-
-class AgentListItem(BaseModel):
-    """Serialized agent entry for UI/API consumption."""
-
-    label: str
-    agent_address: str
-    stored_at: float
-    owner_wallet: str
-
-
 class AgentAlreadyRegisteredError(ValueError):
     """Raised when attempting to register a duplicate agent address."""
 
@@ -100,29 +94,32 @@ def _success(data: dict[str, Any]) -> dict[str, Any]:
     return {"ok": True, "data": data}
 
 
-def _agent_vault_context(request: Request) -> dict[str, Any]:
-    wallet = request.session.get("wallet_address")
-    normalized_wallet, items = agent_vault_view(wallet, request.session.get("active_agent_address"))
+def _agent_vault_context(wallet: str | None, active: str | None) -> dict[str, Any]:
+    normalized_wallet, items = agent_vault_view(wallet, active)
 
     return {
-        "request": request,
         "wallet_address": normalized_wallet,
         "agents": items,
-        "active_agent": storage.normalize_address(request.session.get("active_agent_address")),
+        "active_agent": storage.normalize_address(active),
     }
 
 
-def _agent_vault_fragment(request: Request, *, trigger_refresh: bool = False) -> HTMLResponse:
-    response = templates.TemplateResponse("authz/_agent_list.html", _agent_vault_context(request))
-    if trigger_refresh:
-        response.headers["HX-Trigger"] = "agent:refresh"
-    return response
+def _agent_vault_fragment(wallet: str | None, active: str | None) -> HTMLResponse:
+    return HTMLResponse(_AGENT_LIST_TEMPLATE.render(_agent_vault_context(wallet, active)))
+
 
+def _agent_refresh_response() -> Response:
+    """Empty acknowledgement; the vault refetches /agent/list on the HX-Trigger."""
 
-def _append_agent_audit(action: str, agent_address: str, wallet: str) -> None:
+    return Response(status_code=200, headers={"HX-Trigger": "agent:refresh"})
+
+
+def _append_agent_audit(action: str, agent_address: str, wallet: str, ts_ns: int | None = None) -> None:
+    if ts_ns is None:
+        ts_ns = time.time_ns()
     audit_entry = {
-        "id": secrets.token_hex(16),
-        "ts": time.time(),
+        "id": next_id(),
+        "ts": ts_ns / 1e9,
         "action": action,
         "agent_address": agent_address,
         "wallet_address": wallet,
@@ -130,57 +127,67 @@ def _append_agent_audit(action: str, agent_address: str, wallet: str) -> None:
     storage.append_audit(audit_entry)
 
 
-def _prune_agent(agent_address: str, wallet: str, request: Request) -> str:
+async def _prune_agent(agent_address: str, wallet: str, session: dict[str, Any]) -> str:
     normalized_target = storage.normalize_address(agent_address) or agent_address
 
-    removed = storage.delete_agent(normalized_target, wallet)
+    removed = await asyncio.to_thread(storage.delete_agent, normalized_target, wallet)
     if not removed:
         raise HTTPException(status_code=404, detail="Agent not found")
+    hyperliquid_adapter.evict_agent(normalized_target)
 
-    if storage.normalize_address(request.session.get("active_agent_address")) == normalized_target:
-        request.session.pop("active_agent_address", None)
+    if storage.normalize_address(session.get("active_agent_address")) == normalized_target:
+        session.pop("active_agent_address", None)
 
     _append_agent_audit("agent_deleted", normalized_target, wallet)
     return normalized_target
 
 
 @router.get("/session")
-async def read_wallet_session(request: Request) -> dict[str, Any]:
+async def read_wallet_session(request: Request) -> ORJSONResponse:
     """Return the active wallet address (if any) stored in the session."""
 
-    address = request.session.get("wallet_address")
-    return _success(WalletSessionResponse(address=address).model_dump())
+    return ORJSONResponse(_success({"address": request.session.get("wallet_address")}))
 
 
 @router.post("/session")
 async def upsert_wallet_session(
     payload: WalletSessionPayload, request: Request
-) -> dict[str, Any]:
+) -> ORJSONResponse:
     """Persist the provided wallet address into the session."""
 
     address = payload.address
-    request.session["wallet_address"] = address
-    request.session.pop("active_agent_address", None)
-    return _success(WalletSessionResponse(address=address).model_dump())
+    session = request.session
+    session["wallet_address"] = address
+    session.pop("active_agent_address", None)
+    return ORJSONResponse(_success({"address": address}))
 
 
 @router.delete("/session")
-async def clear_wallet_session(request: Request) -> dict[str, Any]:
+async def clear_wallet_session(request: Request) -> ORJSONResponse:
     """Remove any stored wallet address from the session."""
 
-    request.session.pop("wallet_address", None)
-    request.session.pop("active_agent_address", None)
-    return _success(WalletSessionResponse(address=None).model_dump())
+    session = request.session
+    session.pop("wallet_address", None)
+    session.pop("active_agent_address", None)
+    return ORJSONResponse(_success({"address": None}))
+
+
+def _validate_registration(data: Mapping[str, Any]) -> AgentRegistrationPayload:
+    """Validate raw registration input once via pydantic's model_validate fast path."""
 
+    return AgentRegistrationPayload.model_validate(data)
 
-def _register_agent(payload: AgentRegistrationPayload) -> AgentRegistrationResponse:
-    entries = storage.load_agents()
 
-    if any(entry["agent_address"] == payload.agent_address for entry in entries):
+def _register_agent(payload: AgentRegistrationPayload) -> dict[str, Any]:
+    """Persist the agent and return its public fields as a response-ready dict."""
+
+    # Cheap early exit before encrypting; register_agent re-checks under the registry lock.
+    if storage.has_agent(payload.agent_address):
         raise AgentAlreadyRegisteredError("Agent already registered")
 
     cipher = storage.get_fernet().encrypt(payload.private_key.encode("utf-8")).decode("utf-8")
-    stored_at = time.time()
+    ts_ns = time.time_ns()
+    stored_at = ts_ns / 1e9
     owner_wallet = storage.normalize_address(payload.owner_wallet)
     if not owner_wallet:
         raise HTTPException(status_code=400, detail="Wallet not connected")
@@ -192,61 +199,64 @@ def _register_agent(payload: AgentRegistrationPayload) -> AgentRegistrationRespo
         "owner_wallet": owner_wallet,
     }
 
-    entries.append(registry_entry)
-    storage.write_agents(entries)
+    if not storage.register_agent(registry_entry):
+        raise AgentAlreadyRegisteredError("Agent already registered")
+    _append_agent_audit("agent_registered", payload.agent_address, owner_wallet, ts_ns)
 
-    audit_entry = {
-        "id": secrets.token_hex(16),
-        "ts": time.time(),
-        "action": "agent_registered",
+    return {
         "agent_address": payload.agent_address,
-        "wallet_address": owner_wallet,
+        "label": payload.label,
+        "stored_at": stored_at,
+        "owner_wallet": owner_wallet,
     }
-    storage.append_audit(audit_entry)
-
-    return AgentRegistrationResponse(
-        agent_address=payload.agent_address,
-        label=payload.label,
-        stored_at=stored_at,
-        owner_wallet=owner_wallet,
-    )
 
 
 @router.post("/agent")
 async def register_agent(request: Request) -> Response:
-    session_wallet: str | None = request.session.get("wallet_address")
+    session = request.session
+    session_wallet: str | None = session.get("wallet_address")
+    active_agent: str | None = session.get("active_agent_address")
     content_type = request.headers.get("content-type", "")
     expects_json = "application/json" in content_type
 
     def _set_active(agent_addr: str) -> None:
+        nonlocal active_agent
         normalized = storage.normalize_address(agent_addr)
         if normalized:
-            request.session["active_agent_address"] = normalized
+            session["active_agent_address"] = active_agent = normalized
 
     if expects_json:
-        data = await request.json()
+        raw = await request.body()
+        if len(raw) > _MAX_JSON_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Request body too large")
+        try:
+            data = orjson.loads(raw) if raw else {}
+        except orjson.JSONDecodeError as exc:
+            raise HTTPException(status_code=422, detail="Invalid JSON body") from exc
+        if not isinstance(data, dict):
+            raise HTTPException(status_code=422, detail="Expected a JSON object")
         try:
-            payload = AgentRegistrationPayload(**data, owner_wallet=session_wallet)
-            response = _register_agent(payload)
+            payload = _validate_registration({**data, "owner_wallet": session_wallet})
+            response = await asyncio.to_thread(_register_agent, payload)
         except ValidationError as exc:
-            raise HTTPException(status_code=422, detail=exc.errors()) from exc
+            raise HTTPException(status_code=422, detail=exc.errors(include_context=False)) from exc
         except AgentAlreadyRegisteredError as exc:
             raise HTTPException(status_code=409, detail=str(exc)) from exc
-        _set_active(response.agent_address)
-        summary = agent_summary_view(session_wallet, request.session.get("active_agent_address"))
-        body = response.model_dump()
-        body["summary"] = summary
-        return JSONResponse(_success(body), headers={"HX-Trigger": "agent:refresh"})
+        _set_active(response["agent_address"])
+        response["summary"] = agent_summary_view(session_wallet, active_agent)
+        return ORJSONResponse(_success(response), headers={"HX-Trigger": "agent:refresh"})
 
     form = await request.form()
     try:
-        payload = AgentRegistrationPayload(
-            label=str(form.get("label", "")),
-            agent_address=str(form.get("agent_address", "")),
-            private_key=str(form.get("private_key", "")),
-            owner_wallet=session_wallet,
+        payload = _validate_registration(
+            {
+                "label": str(form.get("label", "")),
+                "agent_address": str(form.get("agent_address", "")),
+                "private_key": str(form.get("private_key", "")),
+                "owner_wallet": session_wallet,
+            }
         )
-        response = _register_agent(payload)
+        response = await asyncio.to_thread(_register_agent, payload)
     except ValidationError as exc:
         message = ", ".join(err["msg"] for err in exc.errors())
         context = {"status": "error", "message": message or "Invalid agent details provided"}
@@ -256,110 +266,97 @@ async def register_agent(request: Request) -> Response:
         detail = exc.detail if isinstance(exc.detail, str) else "Wallet must be connected."
         context = {"status": "error", "message": detail}
     else:
-        _set_active(response.agent_address)
+        address = response["agent_address"]
+        _set_active(address)
         context = {
             "status": "success",
-            "message": f"Agent {response.label} stored for {response.agent_address[:6]}…{response.agent_address[-4:]}",
+            "message": f"Agent {response['label']} stored for {address[:6]}…{address[-4:]}",
         }
 
-    template_response = templates.TemplateResponse(
-        "authz/agent_status.html",
-        {
-            "request": request,
-            **context,
-            "agent_summary": agent_summary_view(session_wallet, request.session.get("active_agent_address")),
-        },
-    )
-    if context.get("status") == "success":
-        template_response.headers["HX-Trigger"] = "agent:refresh"
-    return template_response
-
-
-@router.get("/agents", response_class=JSONResponse)
-async def list_agents(request: Request) -> JSONResponse:
-    wallet = request.session.get("wallet_address")
-    _, agents = agent_vault_view(wallet, request.session.get("active_agent_address"))
+    headers = {"HX-Trigger": "agent:refresh"} if context.get("status") == "success" else None
+    return HTMLResponse(_AGENT_STATUS_TEMPLATE.render(context), headers=headers)
+
+
+@router.get("/agents", response_class=ORJSONResponse)
+async def list_agents(request: Request) -> ORJSONResponse:
+    session = request.session
+    wallet = session.get("wallet_address")
+    _, agents = agent_vault_view(wallet, session.get("active_agent_address"))
+    owner_wallet = wallet or ""
     serialized = [
-        AgentListItem(
-            label=item["label"],
-            agent_address=item["agent_address"],
-            stored_at=item["stored_at"],
-            owner_wallet=wallet or "",
-        ).model_dump()
+        {
+            "label": item["label"],
+            "agent_address": item["agent_address"],
+            "stored_at": item["stored_at"],
+            "owner_wallet": owner_wallet,
+        }
         for item in agents
     ]
-    return JSONResponse(_success({"agents": serialized}))
+    return ORJSONResponse(_success({"agents": serialized}))
 
 
 class AgentDeletePayload(BaseModel):
-    agent_address: str
+    agent_address: AgentAddress
 
-    @field_validator("agent_address")
-    @classmethod
-    def validate_agent_address(cls, value: str) -> str:
-        if not _AGENT_ADDRESS_RE.fullmatch(value or ""):
-            raise ValueError("Agent address must be 0x-prefixed (40 bytes).")
-        return value.lower()
 
+class AgentSelectPayload(BaseModel):
+    agent_address: AgentAddress
 
-@router.delete("/agent", response_class=JSONResponse)
-async def delete_agent_api(payload: AgentDeletePayload, request: Request) -> JSONResponse:
-    wallet = request.session.get("wallet_address")
-    if not wallet:
-        raise HTTPException(status_code=400, detail="Wallet not connected")
 
-    normalized = _prune_agent(payload.agent_address, wallet, request)
-    return JSONResponse(_success({"agent_address": normalized}), headers={"HX-Trigger": "agent:refresh"})
+_FormPayload = TypeVar("_FormPayload", AgentDeletePayload, AgentSelectPayload)
 
 
-@router.post("/agent/delete")
-async def delete_agent(request: Request) -> HTMLResponse:
-    wallet = request.session.get("wallet_address")
-    if not wallet:
-        raise HTTPException(status_code=400, detail="Wallet not connected")
+async def _form_payload(request: Request, model: type[_FormPayload]) -> _FormPayload:
+    """Validate the form's agent_address, after the caller's wallet check."""
 
     form = await request.form()
     try:
-        payload = AgentDeletePayload(agent_address=str(form.get("agent_address", "")))
+        return model(agent_address=str(form.get("agent_address", "")))
     except ValidationError as exc:
-        raise HTTPException(status_code=422, detail=exc.errors()) from exc
+        raise HTTPException(status_code=422, detail=exc.errors(include_context=False)) from exc
 
-    _prune_agent(payload.agent_address, wallet, request)
-    return _agent_vault_fragment(request, trigger_refresh=True)
 
+@router.delete("/agent", response_class=ORJSONResponse)
+async def delete_agent_api(payload: AgentDeletePayload, request: Request) -> ORJSONResponse:
+    session = request.session
+    wallet = session.get("wallet_address")
+    if not wallet:
+        raise HTTPException(status_code=400, detail="Wallet not connected")
 
-@router.get("/agent/list", response_class=HTMLResponse)
-async def agent_list_partial(request: Request) -> HTMLResponse:
-    return _agent_vault_fragment(request)
+    normalized = await _prune_agent(payload.agent_address, wallet, session)
+    return ORJSONResponse(_success({"agent_address": normalized}), headers={"HX-Trigger": "agent:refresh"})
 
 
-class AgentSelectPayload(BaseModel):
-    agent_address: str
+@router.post("/agent/delete")
+async def delete_agent(request: Request) -> Response:
+    session = request.session
+    wallet = session.get("wallet_address")
+    if not wallet:
+        raise HTTPException(status_code=400, detail="Wallet not connected")
 
-    @field_validator("agent_address")
-    @classmethod
-    def validate_agent_address(cls, value: str) -> str:
-        if not _AGENT_ADDRESS_RE.fullmatch(value or ""):
-            raise ValueError("Agent address must be 0x-prefixed (40 bytes).")
-        return value.lower()
+    payload = await _form_payload(request, AgentDeletePayload)
+    await _prune_agent(payload.agent_address, wallet, session)
+    return _agent_refresh_response()
+
+
+@router.get("/agent/list", response_class=HTMLResponse)
+async def agent_list_partial(request: Request) -> HTMLResponse:
+    session = request.session
+    return _agent_vault_fragment(session.get("wallet_address"), session.get("active_agent_address"))
 
 
 @router.post("/agent/select")
-async def select_active_agent(request: Request) -> HTMLResponse:
-    wallet = request.session.get("wallet_address")
+async def select_active_agent(request: Request) -> Response:
+    session = request.session
+    wallet = session.get("wallet_address")
     if not wallet:
         raise HTTPException(status_code=400, detail="Wallet not connected")
 
-    form = await request.form()
-    try:
-        payload = AgentSelectPayload(agent_address=str(form.get("agent_address", "")))
-    except ValidationError as exc:
-        raise HTTPException(status_code=422, detail=exc.errors()) from exc
-
-    agents = storage.agents_for_wallet(wallet)
+    payload = await _form_payload(request, AgentSelectPayload)
     normalized = storage.normalize_address(payload.agent_address)
-    if not any(storage.normalize_address(agent["agent_address"]) == normalized for agent in agents):
+    agent = storage.get_agent(normalized)
+    if agent is None or storage.normalize_address(agent.get("owner_wallet")) != storage.normalize_address(wallet):
         raise HTTPException(status_code=404, detail="Agent not found")
 
-    request.session["active_agent_address"] = normalized
-    return _agent_vault_fragment(request, trigger_refresh=True)
+    session["active_agent_address"] = normalized
+    return _agent_refresh_response()
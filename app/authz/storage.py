@@ -2,28 +2,48 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache, wraps
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, TypeVar
 
+import orjson
 from cryptography.fernet import Fernet
 
 from app.config import get_settings
+from app.lib.logger import get_logger
+
+
+logger = get_logger(__name__)
 
 
 def _settings():
     return get_settings()
 
 
+# Settings are cached for the life of the process, so the derived paths are too.
+@lru_cache(maxsize=1)
 def storage_dir() -> Path:
     settings = _settings()
     return settings.storage_dir
 
 
+@lru_cache(maxsize=1)
 def agents_path() -> Path:
+    return storage_dir() / "agents.jsonl"
+
+
+@lru_cache(maxsize=1)
+def _legacy_agents_path() -> Path:
     return storage_dir() / "agents.json"
 
 
+@lru_cache(maxsize=1)
 def audit_log_path() -> Path:
     return storage_dir() / "audit_log.jsonl"
 
@@ -32,60 +52,370 @@ def _ensure_storage_dir() -> None:
     storage_dir().mkdir(parents=True, exist_ok=True)
 
 
-def load_agents() -> list[dict[str, Any]]:
-    """Return list of stored agent metadata records."""
+_REGISTRY_GENERATIONS = itertools.count(1)
+
+# Registry reads and writes may run in worker threads (asyncio.to_thread), so the
+# cache swap and the file append/replace it mirrors must happen atomically.
+_REGISTRY_LOCK = threading.RLock()
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def _locked(func: _F) -> _F:
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with _REGISTRY_LOCK:
+            return func(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+# Compact the agents log once superseded lines exceed this share of live records.
+_COMPACT_RATIO = 0.25
+
+
+@dataclass
+class _AgentRegistry:
+    """Replayed agents log plus lookup indexes, valid for one (mtime_ns, size)."""
+
+    mtime_ns: int
+    size: int
+    entries: list[dict[str, Any]]
+    stale_lines: int = 0
+    by_address: dict[str, dict[str, Any]] = field(default_factory=dict)
+    by_owner: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+    unclaimed: list[dict[str, Any]] = field(default_factory=list)
+    generation: int = field(default_factory=lambda: next(_REGISTRY_GENERATIONS))
+
+    def __post_init__(self) -> None:
+        for entry in self.entries:
+            address = normalize_address(entry.get("agent_address"))
+            if address:
+                self.by_address[address] = entry
+            owner = normalize_address(entry.get("owner_wallet"))
+            if owner:
+                self.by_owner.setdefault(owner, []).append(entry)
+            else:
+                self.unclaimed.append(entry)
+
+
+_AGENTS_CACHE: _AgentRegistry | None = None
+
+
+def _replay_agents(data: bytes) -> tuple[list[dict[str, Any]], int]:
+    """Fold agents log lines into live records; return them with the stale line count."""
+
+    live: dict[Any, dict[str, Any]] = {}
+    lines = 0
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
+        lines += 1
+        key = normalize_address(record.get("agent_address")) or record.get("agent_address")
+        if record.get("op") == "del":
+            live.pop(key, None)
+        else:
+            live[key] = record
+    return list(live.values()), lines - len(live)
 
+
+def _cache_registry(path: Path, entries: list[dict[str, Any]], stale_lines: int) -> _AgentRegistry:
+    global _AGENTS_CACHE
+    stat = path.stat()
+    _AGENTS_CACHE = _AgentRegistry(stat.st_mtime_ns, stat.st_size, entries, stale_lines)
+    return _AGENTS_CACHE
+
+
+def _import_legacy_agents() -> bool:
+    """Convert a pre-JSONL agents.json registry into the append-only log."""
+
+    legacy_path = _legacy_agents_path()
+    if not legacy_path.exists():
+        return False
+    write_agents(orjson.loads(legacy_path.read_bytes()))
+    legacy_path.replace(legacy_path.with_name("agents.json.bak"))
+    return True
+
+
+@_locked
+def _registry() -> _AgentRegistry | None:
+    """Return the indexed registry, replaying the log only when it changed."""
+
+    global _AGENTS_CACHE
     path = agents_path()
-    if not path.exists():
-        return []
-    return json.loads(path.read_text(encoding="utf-8"))
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        _AGENTS_CACHE = None
+        if _import_legacy_agents():
+            return _AGENTS_CACHE
+        return None
+
+    cached = _AGENTS_CACHE
+    if cached is not None and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+        return cached
+
+    data = path.read_bytes()
+    if data and not data.endswith(b"\n"):
+        # A torn last line from a crash mid-append is skipped on replay; terminate it so
+        # the next append does not land on the same line.
+        with path.open("ab") as fh:
+            fh.write(b"\n")
+        stat = path.stat()
+    entries, stale_lines = _replay_agents(data)
+    _AGENTS_CACHE = _AgentRegistry(stat.st_mtime_ns, stat.st_size, entries, stale_lines)
+    return _AGENTS_CACHE
 
 
+def load_agents() -> list[dict[str, Any]]:
+    """Return list of stored agent metadata records.
+
+    The replayed registry is cached until the file's mtime or size changes; callers
+    that mutate the result must pass a copy back through ``write_agents``.
+    """
+
+    registry = _registry()
+    return registry.entries if registry is not None else []
+
+
+@_locked
 def write_agents(entries: list[dict[str, Any]]) -> None:
-    """Persist full list of agent records."""
+    """Rewrite the agents log atomically with exactly the provided live records."""
 
     _ensure_storage_dir()
-    agents_path().write_text(json.dumps(entries, indent=2), encoding="utf-8")
+    path = agents_path()
+    tmp_path = path.with_suffix(".jsonl.tmp")
+    tmp_path.write_bytes(b"".join(orjson.dumps(entry) + b"\n" for entry in entries))
+    os.replace(tmp_path, path)
+    _cache_registry(path, entries, 0)
+
+
+def _append_agent_records(records: list[dict[str, Any]]) -> Path:
+    _ensure_storage_dir()
+    path = agents_path()
+    with path.open("ab") as fh:
+        fh.write(b"".join(orjson.dumps(record) + b"\n" for record in records))
+    return path
+
+
+@_locked
+def append_agent(entry: dict[str, Any]) -> None:
+    """Append a single agent record to the log without replaying it."""
+
+    registry = _registry()
+    entries = registry.entries if registry is not None else []
+    stale_lines = registry.stale_lines if registry is not None else 0
+    path = _append_agent_records([entry])
+    _cache_registry(path, [*entries, entry], stale_lines)
+
+
+@_locked
+def register_agent(entry: dict[str, Any]) -> bool:
+    """Append ``entry`` unless its agent address is already registered.
+
+    The check and the append share one hold of the registry lock, so concurrent
+    registrations of the same address cannot both succeed. Returns whether it was stored.
+    """
+
+    if has_agent(entry.get("agent_address")):
+        return False
+    append_agent(entry)
+    return True
+
+
+@_locked
+def compact_agents() -> None:
+    """Rewrite the agents log without tombstones or superseded records."""
+
+    registry = _registry()
+    if registry is not None and registry.stale_lines:
+        write_agents(registry.entries)
+
+
+def agents_version() -> int:
+    """Return a token that changes whenever the agents file is rewritten."""
+
+    registry = _registry()
+    return registry.generation if registry is not None else 0
+
+
+def get_agent(agent_address: str | None) -> dict[str, Any] | None:
+    """Return the registry entry for an agent address, if one is stored."""
+
+    normalized = normalize_address(agent_address)
+    if not normalized:
+        return None
+    registry = _registry()
+    return registry.by_address.get(normalized) if registry is not None else None
+
+
+def has_agent(agent_address: str | None) -> bool:
+    """Return whether an agent with this address is already registered."""
+
+    return get_agent(agent_address) is not None
 
 
 def normalize_address(value: str | None) -> str | None:
     if not isinstance(value, str):
         return None
+    return _normalize_address_str(value)
+
+
+@lru_cache(maxsize=1024)
+def _normalize_address_str(value: str) -> str | None:
+    # Agent and wallet addresses form a small recurring set, so memoizing
+    # strip/lower/check turns repeated normalization into a cache hit.
     lowered = value.strip().lower()
     return lowered if lowered.startswith("0x") and len(lowered) == 42 else None
 
 
 def agents_for_wallet(owner_wallet: str | None) -> list[dict[str, Any]]:
-    """Return agent entries owned by the provided wallet (auto-claim legacy records)."""
-
-    entries = load_agents()
-    if not owner_wallet:
-        return []
+    """Return agent entries owned by the provided wallet."""
 
     owner_wallet_normalized = normalize_address(owner_wallet)
     if not owner_wallet_normalized:
         return []
 
-    mutated = False
-    for entry in entries:
-        if "owner_wallet" not in entry or not normalize_address(entry.get("owner_wallet")):
-            entry["owner_wallet"] = owner_wallet_normalized
-            mutated = True
+    registry = _registry()
+    if registry is None:
+        return []
+    if registry.unclaimed:
+        # No LEGACY_OWNER_WALLET was configured for the startup migration, so rows from
+        # before owner tracking go to the first wallet that views them, as they always did.
+        registry = _claim_unclaimed(owner_wallet_normalized)
+        if registry is None:
+            return []
+    return registry.by_owner.get(owner_wallet_normalized, [])
+
+
+@_locked
+def _claim_unclaimed(owner: str) -> _AgentRegistry | None:
+    """Assign every ownerless agent row to ``owner`` and return the updated registry."""
+
+    registry = _registry()
+    if registry is None or not registry.unclaimed:
+        return registry
+    unclaimed = {id(entry) for entry in registry.unclaimed}
+    write_agents([{**entry, "owner_wallet": owner} if id(entry) in unclaimed else entry for entry in registry.entries])
+    return _AGENTS_CACHE
+
+
+@lru_cache(maxsize=1)
+def _owners_migrated_path() -> Path:
+    return storage_dir() / ".owners_migrated"
+
+
+@_locked
+def migrate_legacy_owners(default_wallet: str | None) -> None:
+    """Assign ``default_wallet`` to agent rows stored before owner tracking existed.
+
+    Runs at most once per storage directory; a sentinel file records completion.
+    Without a default, rows are left for ``agents_for_wallet`` to hand to the first
+    wallet that views them, and the migration runs again on the next start.
+    """
+
+    sentinel = _owners_migrated_path()
+    if sentinel.exists():
+        return
+
+    registry = _registry()
+    if registry is not None and registry.unclaimed:
+        owner = normalize_address(default_wallet)
+        if not owner:
+            logger.warning(
+                "legacy_agent_owner_unset",
+                extra={"unclaimed_agents": len(registry.unclaimed), "fallback": "claim_on_view"},
+            )
+            return
+        _claim_unclaimed(owner)
 
-    if mutated:
-        write_agents(entries)
+    _ensure_storage_dir()
+    sentinel.touch()
 
-    return [entry for entry in entries if normalize_address(entry.get("owner_wallet")) == owner_wallet_normalized]
 
+_AUDIT_BATCH_MAX = 100
+# After the first queued record, wait this long for more so a burst shares one write.
+_AUDIT_LINGER_SECONDS = 0.05
+# Pause before retrying a batch whose write failed (full disk, permissions).
+_AUDIT_RETRY_SECONDS = 1.0
+_AUDIT_QUEUE: asyncio.Queue[dict[str, Any]] | None = None
+_AUDIT_LOOP: asyncio.AbstractEventLoop | None = None
 
-def append_audit(entry: dict[str, Any]) -> None:
-    """Append a structured audit record."""
 
+def append_audit(entry: dict[str, Any]) -> None:
+    """Append a structured audit record.
+
+    While the background writer is running the entry is queued without touching
+    the disk; otherwise (scripts, tests without lifespan) it is written inline.
+    """
+
+    queue, loop = _AUDIT_QUEUE, _AUDIT_LOOP
+    if queue is not None and loop is not None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            queue.put_nowait(entry)
+            return
+        # Sync background tasks call this from worker threads; asyncio queues are not
+        # thread-safe, so hand the entry to the writer's loop.
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, entry)
+            return
+        except RuntimeError:  # loop already closed
+            pass
+    _write_audit_batch([entry])
+
+
+def _write_audit_batch(entries: list[dict[str, Any]]) -> None:
     _ensure_storage_dir()
-    with audit_log_path().open("a", encoding="utf-8") as fh:
-        fh.write(json.dumps(entry) + "\n")
-
-
+    payload = b"".join(orjson.dumps(entry) + b"\n" for entry in entries)
+    with audit_log_path().open("ab") as fh:
+        fh.write(payload)
+
+
+async def run_audit_writer() -> None:
+    """Drain queued audit records in batches until cancelled."""
+
+    global _AUDIT_QUEUE, _AUDIT_LOOP
+    queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    _AUDIT_QUEUE = queue
+    _AUDIT_LOOP = asyncio.get_running_loop()
+    # Records taken off the queue but not yet handed to a write; flushed on cancel.
+    batch: list[dict[str, Any]] = []
+    try:
+        while True:
+            if not batch:
+                batch = [await queue.get()]
+            if queue.qsize() < _AUDIT_BATCH_MAX - 1:
+                await asyncio.sleep(_AUDIT_LINGER_SECONDS)
+            while len(batch) < _AUDIT_BATCH_MAX and not queue.empty():
+                batch.append(queue.get_nowait())
+            # A write already in its thread completes even if this task is cancelled.
+            writing, batch = batch, []
+            try:
+                await asyncio.to_thread(_write_audit_batch, writing)
+            except OSError:
+                logger.exception("audit_write_failed", extra={"entries": len(writing)})
+                # Keep the records; they lead the next attempt (or the final flush).
+                batch = writing
+                await asyncio.sleep(_AUDIT_RETRY_SECONDS)
+    finally:
+        _AUDIT_QUEUE = None
+        _AUDIT_LOOP = None
+        pending: list[dict[str, Any]] = batch
+        while not queue.empty():
+            pending.append(queue.get_nowait())
+        if pending:
+            _write_audit_batch(pending)
+
+
+@lru_cache(maxsize=1)
 def get_fernet() -> Fernet:
     """Return Fernet instance seeded with application secret."""
 
@@ -93,6 +423,52 @@ def get_fernet() -> Fernet:
     return Fernet(settings.fernet_key)
 
 
+# Decrypted agent keys are held briefly so back-to-back start/stop/transfer calls skip
+# the Fernet decrypt. Entries are keyed by ciphertext, so a re-registered key misses,
+# and expired or deleted entries have their buffer overwritten before being dropped.
+_DECRYPTED_KEY_TTL_SECONDS = 30.0
+_DECRYPTED_KEYS: dict[str, tuple[float, bytearray]] = {}
+_DECRYPTED_KEYS_LOCK = threading.Lock()
+# The Fernet instance the cached plaintexts were decrypted with; a different one (the
+# get_fernet cache was cleared, e.g. after a key change) invalidates them all.
+_DECRYPTED_KEYS_FERNET: Fernet | None = None
+
+
+def _wipe_decrypted_key(cipher: str) -> None:
+    cached = _DECRYPTED_KEYS.pop(cipher, None)
+    if cached is not None:
+        buffer = cached[1]
+        buffer[:] = bytes(len(buffer))
+
+
+def decrypt_agent_key(cipher: str) -> str:
+    """Decrypt an agent's ``key_cipher``, reusing a recent result for the same ciphertext.
+
+    Raises ``cryptography.fernet.InvalidToken`` if the ciphertext does not verify.
+    """
+
+    global _DECRYPTED_KEYS_FERNET
+
+    fernet = get_fernet()
+    now = time.monotonic()
+    with _DECRYPTED_KEYS_LOCK:
+        if fernet is not _DECRYPTED_KEYS_FERNET:
+            for stale in list(_DECRYPTED_KEYS):
+                _wipe_decrypted_key(stale)
+            _DECRYPTED_KEYS_FERNET = fernet
+        for stale in [key for key, (expires, _) in _DECRYPTED_KEYS.items() if expires <= now]:
+            _wipe_decrypted_key(stale)
+        cached = _DECRYPTED_KEYS.get(cipher)
+        if cached is not None:
+            return cached[1].decode("utf-8")
+
+    plaintext = bytearray(fernet.decrypt(cipher.encode("utf-8")))
+    with _DECRYPTED_KEYS_LOCK:
+        _DECRYPTED_KEYS[cipher] = (now + _DECRYPTED_KEY_TTL_SECONDS, plaintext)
+    return plaintext.decode("utf-8")
+
+
+@_locked
 def delete_agent(agent_address: str, owner_wallet: str) -> bool:
     """Remove an agent entry owned by the specified wallet."""
 
@@ -101,18 +477,25 @@ def delete_agent(agent_address: str, owner_wallet: str) -> bool:
     if not normalized_wallet or not normalized_agent:
         return False
 
-    entries = load_agents()
-    new_entries: list[dict[str, Any]] = []
-    removed = False
-    for entry in entries:
-        entry_agent = normalize_address(entry.get("agent_address"))
-        entry_owner = normalize_address(entry.get("owner_wallet"))
-        if entry_agent == normalized_agent and entry_owner == normalized_wallet:
-            removed = True
-            continue
-        new_entries.append(entry)
+    registry = _registry()
+    if registry is None:
+        return False
 
-    if removed:
-        write_agents(new_entries)
+    target = registry.by_address.get(normalized_agent)
+    if target is None or normalize_address(target.get("owner_wallet")) != normalized_wallet:
+        return False
 
-    return removed
+    cipher = target.get("key_cipher")
+    if cipher:
+        with _DECRYPTED_KEYS_LOCK:
+            _wipe_decrypted_key(cipher)
+
+    entries = [entry for entry in registry.entries if entry is not target]
+    # The tombstone plus the record it shadows are both dead weight in the log.
+    stale_lines = registry.stale_lines + 2
+    if stale_lines > len(entries) * _COMPACT_RATIO:
+        write_agents(entries)
+    else:
+        path = _append_agent_records([{"op": "del", "agent_address": normalized_agent}])
+        _cache_registry(path, entries, stale_lines)
+    return True
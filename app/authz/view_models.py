@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime
-from typing import Any, Iterable
+from functools import lru_cache
+from typing import Any
 
 from app.authz import storage
 
@@ -23,6 +24,41 @@ def _short_address(address: str | None) -> str:
     return f"{address[:6]}…{address[-4:]}"
 
 
+@lru_cache(maxsize=256)
+def _agent_views(
+    normalized_wallet: str | None,
+    normalized_active: str | None,
+    registry_version: int,
+) -> tuple[list[dict[str, Any]], dict[str, Any] | None, list[dict[str, Any]]]:
+    """Build vault items, active item, and secondary items in a single pass.
+
+    ``registry_version`` only keys the cache so results are dropped whenever the
+    agents file changes.
+    """
+
+    items: list[dict[str, Any]] = []
+    active_item: dict[str, Any] | None = None
+    secondary_items: list[dict[str, Any]] = []
+    for entry in storage.agents_for_wallet(normalized_wallet):
+        agent_address = storage.normalize_address(entry.get("agent_address"))
+        is_active = agent_address == normalized_active
+        item = {
+            "label": entry.get("label", "Unnamed"),
+            "agent_address": agent_address or "",
+            "agent_short": _short_address(agent_address),
+            "stored_at": entry.get("stored_at"),
+            "stored_display": _format_timestamp(entry.get("stored_at")),
+            "is_active": is_active,
+        }
+        items.append(item)
+        if is_active:
+            active_item = active_item or item
+        else:
+            secondary_items.append(item)
+
+    return items, active_item, secondary_items
+
+
 def agent_vault_view(
     wallet_address: str | None,
     active_agent_address: str | None,
@@ -31,23 +67,7 @@ def agent_vault_view(
 
     normalized_wallet = storage.normalize_address(wallet_address)
     normalized_active = storage.normalize_address(active_agent_address)
-
-    entries = storage.agents_for_wallet(wallet_address)
-
-    items: list[dict[str, Any]] = []
-    for entry in entries:
-        agent_address = storage.normalize_address(entry.get("agent_address"))
-        items.append(
-            {
-                "label": entry.get("label", "Unnamed"),
-                "agent_address": agent_address or "",
-                "agent_short": _short_address(agent_address),
-                "stored_at": entry.get("stored_at"),
-                "stored_display": _format_timestamp(entry.get("stored_at")),
-                "is_active": agent_address == normalized_active,
-            }
-        )
-
+    items, _, _ = _agent_views(normalized_wallet, normalized_active, storage.agents_version())
     return normalized_wallet, items
 
 
@@ -57,15 +77,11 @@ def agent_summary_view(
 ) -> dict[str, Any]:
     """Assemble compact summary for overview/start panel."""
 
-    normalized_wallet, items = agent_vault_view(wallet_address, active_agent_address)
+    normalized_wallet = storage.normalize_address(wallet_address)
     normalized_active = storage.normalize_address(active_agent_address)
-
-    active_item = next((item for item in items if item["is_active"]), None)
-    fallback_item = next((item for item in items if item["agent_address"] == normalized_active), None)
-    if not active_item and fallback_item:
-        active_item = fallback_item
-
-    secondary_items = [item for item in items if not item.get("is_active")]
+    items, active_item, secondary_items = _agent_views(
+        normalized_wallet, normalized_active, storage.agents_version()
+    )
 
     return {
         "wallet_address": normalized_wallet,
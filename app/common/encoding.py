@@ -0,0 +1,26 @@
+"""Helpers for hand-built JSON payloads that match pydantic's JSON output."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+def json_datetime(value: datetime) -> str:
+    """Render ``value`` as pydantic does in JSON mode (UTC offsets become ``Z``)."""
+
+    text = value.isoformat()
+    if text.endswith("+00:00"):
+        return text[:-6] + "Z"
+    return text
+
+
+def ok_envelope(model: BaseModel) -> bytes:
+    """Return ``{"ok": true, "data": <model>}`` as JSON bytes.
+
+    pydantic-core writes the model's JSON directly; it is spliced into the envelope
+    instead of dumping to Python objects and re-encoding them.
+    """
+
+    return b'{"ok":true,"data":' + model.model_dump_json().encode("utf-8") + b"}"
@@ -0,0 +1,66 @@
+"""Template environment and page context shared by the UI routers."""
+
+from __future__ import annotations
+
+import time
+from datetime import UTC, datetime
+from functools import lru_cache
+from typing import Any
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from app.config import get_settings
+from app.paths import TEMPLATES_DIR
+
+
+def _template_env() -> Environment:
+    # Compiled templates are cached on disk across restarts. In prod templates are
+    # immutable, so the per-lookup mtime check that drives auto_reload is skipped.
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        autoescape=True,
+        auto_reload=get_settings().hl_env != "prod",
+        bytecode_cache=FileSystemBytecodeCache(),
+    )
+
+
+TEMPLATES = Jinja2Templates(env=_template_env())
+
+
+# The footer year only changes at New Year, so the clock is consulted at most hourly.
+_YEAR_TTL_SECONDS = 3600.0
+_current_year = (datetime.now(tz=UTC).year, time.monotonic())
+
+
+def current_year() -> int:
+    """Return the current UTC year, refreshed at most once per hour."""
+
+    global _current_year
+    year, checked_at = _current_year
+    now = time.monotonic()
+    if now - checked_at >= _YEAR_TTL_SECONDS:
+        year = datetime.now(tz=UTC).year
+        _current_year = (year, now)
+    return year
+
+
+_NO_WALLET_CONTEXT: dict[str, Any] = {"wallet_address": None, "wallet_address_short": None}
+
+
+@lru_cache(maxsize=4096)
+def _wallet_context_for(address: str) -> dict[str, Any]:
+    return {"wallet_address": address, "wallet_address_short": f"{address[:6]}…{address[-4:]}"}
+
+
+def wallet_context(session: dict[str, Any]) -> dict[str, Any]:
+    """Assemble wallet-related context for templates.
+
+    The dict is shared per wallet address (callers spread it into their own context),
+    so it must be treated as read-only.
+    """
+
+    wallet_address: str | None = session.get("wallet_address")
+    if not wallet_address:
+        return _NO_WALLET_CONTEXT
+    return _wallet_context_for(wallet_address)
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import base64
 import hashlib
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Any, Literal
 
@@ -28,6 +28,8 @@ class Settings(BaseSettings):
     hl_ws_url: str = Field(default=_TESTNET_WS, alias="HL_WS_URL")
     storage_dir: Path = Field(default=Path("storage"), alias="STORAGE_DIR")
     request_rate_limit_per_minute: int = Field(default=60, alias="REQUEST_RATE_LIMIT_PER_MINUTE")
+    max_concurrent_monitors: int = Field(default=64, ge=1, alias="MAX_CONCURRENT_MONITORS")
+    legacy_owner_wallet: str | None = Field(default=None, alias="LEGACY_OWNER_WALLET")
 
     model_config = {
         "env_file": ".env",
@@ -44,7 +46,7 @@ class Settings(BaseSettings):
             if not self.model_fields_set.intersection({"hl_ws_url"}):
                 self.hl_ws_url = _MAINNET_WS
 
-    @property
+    @cached_property
     def fernet_key(self) -> bytes:
         """Return a Fernet-compatible key derived from the secret salt."""
 
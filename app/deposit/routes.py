@@ -2,14 +2,14 @@
 
 from __future__ import annotations
 
-from datetime import UTC, datetime
-from decimal import Decimal, InvalidOperation
-from typing import Any, Callable
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from functools import lru_cache
+from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, ORJSONResponse
 
+from app.common.web import TEMPLATES, current_year, wallet_context
 from app.config import get_settings
 from app.lib.info_client import InfoClient, InfoClientError
 
@@ -18,33 +18,70 @@ router = APIRouter()
 
 def get_info_client() -> InfoClient:
     settings = get_settings()
-    return InfoClient(settings.hl_rest_base)
+    return _shared_info_client(settings.hl_rest_base)
 
 
-def get_templates(request: Request) -> Jinja2Templates:
-    templates: Jinja2Templates = request.app.state.templates  # type: ignore[attr-defined]
-    return templates
+@lru_cache(maxsize=4)
+def _shared_info_client(base_url: str) -> InfoClient:
+    return InfoClient(base_url)
+
+
+async def close_info_client() -> None:
+    """Close the shared InfoClient's connection pool, if one was created."""
+
+    if _shared_info_client.cache_info().currsize:
+        await get_info_client().aclose()
+        _shared_info_client.cache_clear()
+
+
+_USD_COINS = ("USDC", "USD")
+_BALANCE_KEYS = ("total", "available", "amount")
+
+
+def _to_decimal(value: Any) -> Decimal | None:
+    if value is None:
+        return None
+    try:
+        return Decimal(str(value))
+    except (ValueError, ArithmeticError, InvalidOperation):
+        return None
+
+
+def _balance_amount(balance: dict[str, Any]) -> Decimal | None:
+    # First truthy key wins, falling back to the last one (same as an `or` chain).
+    value = next((balance[key] for key in _BALANCE_KEYS if balance.get(key)), balance.get(_BALANCE_KEYS[-1]))
+    return _to_decimal(value)
+
+
+def _format_usd(value: Decimal) -> str:
+    """Format a balance as thousands-separated dollars and cents using integer cents."""
+
+    # Half-even matches the Decimal.quantize default the display used before.
+    cents = int(value.scaleb(2).to_integral_value(ROUND_HALF_EVEN))
+    sign = "-" if cents < 0 else ""
+    dollars, cents = divmod(abs(cents), 100)
+    return f"{sign}{dollars:,}.{cents:02d}"
 
 
 def _extract_usd_balance(payload: dict[str, Any]) -> Decimal:
     """Extract USDC collateral from spot + perp clearinghouse state."""
 
-    def _to_decimal(value: Any) -> Decimal | None:
-        if value is None:
-            return None
-        try:
-            return Decimal(str(value))
-        except (ValueError, ArithmeticError, InvalidOperation):
-            return None
-
     # Spot balances (wallet-style holdings)
     spot_state = payload.get("spotState") or {}
     balances = spot_state.get("balances") or []
+    by_coin: dict[str, dict[str, Any]] = {}
     for balance in balances:
         coin = balance.get("coin")
-        if isinstance(coin, str) and coin.upper() in {"USDC", "USD"}:
-            value = balance.get("total") or balance.get("available") or balance.get("amount")
-            dec_value = _to_decimal(value)
+        if isinstance(coin, str):
+            by_coin.setdefault(coin, balance)
+    for coin in _USD_COINS:
+        balance = by_coin.get(coin)
+        if balance is not None and (dec_value := _balance_amount(balance)) is not None:
+            return dec_value
+    # Slow path for non-canonical casing of the coin symbol.
+    for coin, balance in by_coin.items():
+        if coin not in _USD_COINS and coin.upper() in _USD_COINS:
+            dec_value = _balance_amount(balance)
             if dec_value is not None:
                 return dec_value
 
@@ -85,22 +122,13 @@ async def deposit_instructions(request: Request) -> HTMLResponse:
     context = {
         "request": request,
         "page_title": "Deposit funds",
-        "current_year": datetime.now(tz=UTC).year,
+        "current_year": current_year(),
         "walletconnect_project_id": settings.walletconnect_project_id,
         "hl_env": settings.hl_env,
         "nav_active": "deposit",
-        **build_wallet_context(request),
+        **wallet_context(request.session),
     }
-    return get_templates(request).TemplateResponse("deposit/instructions.html", context)
-
-
-def build_wallet_context(request: Request) -> dict[str, Any]:
-    builder: Callable[[dict[str, Any]], dict[str, Any]] | None = getattr(
-        request.app.state, "wallet_context_builder", None
-    )  # type: ignore[attr-defined]
-    if callable(builder):
-        return builder(request.session)
-    return {"wallet_address": None, "wallet_address_short": None}
+    return TEMPLATES.TemplateResponse("deposit/instructions.html", context)
 
 
 @router.get("/partial/balance", response_class=HTMLResponse)
@@ -120,7 +148,7 @@ async def balance_partial(
         try:
             payload = await info_client.fetch_balances(wallet_address)
             balance_value = _extract_usd_balance(payload)
-            balance_display = f"{balance_value.quantize(Decimal('0.01')):,.2f}"
+            balance_display = _format_usd(balance_value)
         except InfoClientError:
             error_message = "Unable to reach Hyperliquid Info endpoint. Please retry."
     else:
@@ -132,14 +160,14 @@ async def balance_partial(
         "balance_display": balance_display,
         "error_message": error_message,
     }
-    return get_templates(request).TemplateResponse("deposit/_balance_panel.html", {"request": request, **context})
+    return TEMPLATES.TemplateResponse("deposit/_balance_panel.html", {"request": request, **context})
 
 
-@router.get("/api/balance")
+@router.get("/api/balance", response_class=ORJSONResponse)
 async def balance_api(
     request: Request,
     info_client: InfoClient = Depends(get_info_client),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """JSON API for wallet balances (USDC)."""
 
     wallet_address: str | None = request.session.get("wallet_address")
@@ -152,12 +180,11 @@ async def balance_api(
         raise HTTPException(status_code=502, detail="Hyperliquid Info unavailable") from exc
 
     balance_value = _extract_usd_balance(payload)
-    quantized = balance_value.quantize(Decimal("0.01"))
     response = {
         "ok": True,
         "data": {
             "wallet_address": wallet_address,
-            "balance": f"{quantized:,.2f}",
+            "balance": _format_usd(balance_value),
         },
     }
-    return JSONResponse(response)
+    return ORJSONResponse(response)
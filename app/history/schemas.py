@@ -21,10 +21,21 @@ class HistoryEvent(BaseModel):
     run_status: str | None = None
 
 
+class HistoryCursor(BaseModel):
+    """Keyset position of the last returned event; pass back to fetch older entries."""
+
+    before_ts: float
+    before_id: str
+
+
 class HistoryResponse(BaseModel):
-    """Paginated history response payload."""
+    """Paginated history response payload.
+
+    ``total`` is only computed for offset pagination; cursor pages leave it unset.
+    """
 
     items: list[HistoryEvent]
-    total: int
+    total: int | None = None
     offset: int
     limit: int
+    next_cursor: HistoryCursor | None = None
@@ -2,70 +2,299 @@
 
 from __future__ import annotations
 
-import json
+import hashlib
+import heapq
+import os
+import struct
+import threading
+import time
 from datetime import UTC, datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable
+
+import orjson
 
 from app.authz import storage as auth_storage
-from app.history.schemas import HistoryEvent, HistoryResponse
+from app.history.schemas import HistoryCursor, HistoryEvent, HistoryResponse
 from app.trading import storage as trading_storage
 
 
-def _iter_audit_entries(path: Path) -> Iterable[dict]:
-    if not path.exists():
-        return []
-    with path.open(encoding="utf-8") as handle:
-        for line in handle:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                yield json.loads(line)
-            except json.JSONDecodeError:
-                continue
+# Sidecar index over the audit log: one fixed-width record per parsed line holding
+# (ts, byte offset, byte length, blake2b-128 of run_id). Offset pagination sorts
+# and filters these records, then reads back only the lines on the requested page.
+_INDEX_RECORD = struct.Struct("<dQI16s")
+_NO_RUN = bytes(16)
+_INDEX_LOCK = threading.Lock()
 
 
-def load_history(*, offset: int = 0, limit: int = 20, run_id: str | None = None) -> HistoryResponse:
-    offset = max(offset, 0)
+def _index_path(audit_path: Path) -> Path:
+    return audit_path.with_suffix(".idx")
+
+
+def _run_digest(run_id: object) -> bytes:
+    if not run_id:
+        return _NO_RUN
+    return hashlib.blake2b(str(run_id).encode("utf-8"), digest_size=16).digest()
+
+
+def _entry_ts(entry: dict) -> float:
+    try:
+        return float(entry.get("ts") or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+_READ_CHUNK_BYTES = 4 << 20
+
+
+def _index_records(data: bytes, base_offset: int) -> bytes:
+    """Return index records for every complete line in ``data``."""
+
+    records = bytearray()
+    offset = base_offset
+    # bytes.split runs in C; the trailing piece is either empty or a partial line.
+    for line in data.split(b"\n")[:-1]:
+        entry = _parse_line(line)
+        if entry is not None:
+            records += _INDEX_RECORD.pack(
+                _entry_ts(entry), offset, len(line), _run_digest(entry.get("run_id"))
+            )
+        offset += len(line) + 1
+    return bytes(records)
+
+
+def _index_log_from(audit_path: Path, start: int) -> bytes:
+    """Index the log from ``start`` in fixed-size binary chunks, carrying partial lines."""
+
+    records = bytearray()
+    with audit_path.open("rb", buffering=1 << 20) as handle:
+        handle.seek(start)
+        carry = b""
+        base_offset = start
+        while chunk := handle.read(_READ_CHUNK_BYTES):
+            data = carry + chunk
+            consumed = data.rfind(b"\n") + 1
+            records += _index_records(data[:consumed], base_offset)
+            carry = data[consumed:]
+            base_offset += consumed
+    return bytes(records)
+
+
+def _ensure_index(audit_path: Path) -> bytes:
+    """Bring the sidecar index up to date with the audit log and return its records.
+
+    Only the bytes appended since the last indexed line are parsed. A log that
+    shrank (rotated or truncated) triggers a full rebuild.
+    """
+
+    index_path = _index_path(audit_path)
+    with _INDEX_LOCK:
+        try:
+            log_size = audit_path.stat().st_size
+        except FileNotFoundError:
+            index_path.unlink(missing_ok=True)
+            return b""
+
+        try:
+            index = index_path.read_bytes()
+        except FileNotFoundError:
+            index = b""
+        index = index[: len(index) - len(index) % _INDEX_RECORD.size]
+
+        indexed_until = 0
+        if index:
+            _, offset, length, _ = _INDEX_RECORD.unpack_from(index, len(index) - _INDEX_RECORD.size)
+            indexed_until = offset + length + 1
+        if indexed_until > log_size:
+            index, indexed_until = b"", 0
+
+        if indexed_until < log_size:
+            records = _index_log_from(audit_path, indexed_until)
+            if records or not index:
+                index += records
+                tmp_path = index_path.with_suffix(".idx.tmp")
+                tmp_path.write_bytes(index)
+                os.replace(tmp_path, index_path)
+        return index
+
+
+def _read_entries(audit_path: Path, records: list[tuple[float, int, int, bytes]]) -> list[dict]:
+    entries: list[dict] = []
+    fd = os.open(audit_path, os.O_RDONLY)
+    try:
+        for _, offset, length, _ in records:
+            entry = _parse_line(os.pread(fd, length, offset))
+            if entry is not None:
+                entries.append(entry)
+    finally:
+        os.close(fd)
+    return entries
+
+
+def _parse_line(line: bytes) -> dict | None:
+    if not line.strip():
+        return None
+    try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return None
+
+
+def _sort_key(entry: dict) -> tuple[float, str]:
+    return _entry_ts(entry), str(entry.get("id") or "")
+
+
+def _build_events(entries: list[dict]) -> list[HistoryEvent]:
+    run_ids = {entry["run_id"] for entry in entries if entry.get("run_id")}
+    runs = trading_storage.get_runs(run_ids) if run_ids else {}
+    return [_build_event(entry, runs) for entry in entries]
+
+
+def _build_event(entry: dict, runs: dict[str, dict]) -> HistoryEvent:
+    ts = float(entry.get("ts") or 0.0)
+    occurred_at = datetime.fromtimestamp(ts, tz=UTC) if ts else datetime.now(tz=UTC)
+    run_key = entry.get("run_id")
+    run_record = runs.get(run_key) if run_key else None
+    return HistoryEvent(
+        id=str(entry.get("id") or ""),
+        action=str(entry.get("action") or "unknown"),
+        run_id=run_key,
+        ts=ts,
+        occurred_at=occurred_at,
+        payload=entry,
+        explorer_url=_derive_explorer_url(entry),
+        run_status=run_record.get("status") if run_record else None,
+    )
+
+
+def _cursor_after(entry: dict) -> HistoryCursor:
+    before_ts, before_id = _sort_key(entry)
+    return HistoryCursor(before_ts=before_ts, before_id=before_id)
+
+
+# Run statuses shown on each row live in the runs log, outside the cache key, so
+# cached pages are additionally bounded by a short wall-clock TTL.
+_HISTORY_CACHE_TTL_SECONDS = 3.0
+
+
+def load_history(
+    *,
+    offset: int = 0,
+    limit: int = 20,
+    run_id: str | None = None,
+    before_ts: float | None = None,
+    before_id: str | None = None,
+) -> HistoryResponse:
     limit = max(1, min(limit, 100))
+    offset = max(offset, 0)
+    audit_path = auth_storage.audit_log_path()
+    try:
+        stat = audit_path.stat()
+        log_version = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        log_version = (0, 0)
+    ttl_bucket = int(time.monotonic() // _HISTORY_CACHE_TTL_SECONDS)
+    return _load_history_cached(run_id, offset, limit, before_ts, before_id, log_version, ttl_bucket)
+
+
+@lru_cache(maxsize=256)
+def _load_history_cached(
+    run_id: str | None,
+    offset: int,
+    limit: int,
+    before_ts: float | None,
+    before_id: str | None,
+    log_version: tuple[int, int],
+    ttl_bucket: int,
+) -> HistoryResponse:
+    """Build a history page; the log (mtime_ns, size) and TTL bucket only key the cache."""
 
     audit_path = auth_storage.audit_log_path()
-    entries = list(_iter_audit_entries(audit_path))
+    records = list(_INDEX_RECORD.iter_unpack(_ensure_index(audit_path)))
 
     if run_id:
-        entries = [entry for entry in entries if entry.get("run_id") == run_id]
-
-    entries.sort(key=lambda item: item.get("ts") or 0.0, reverse=True)
-
-    total = len(entries)
-    page_entries = entries[offset : offset + limit]
-
-    items: list[HistoryEvent] = []
-    for entry in page_entries:
-        ts = float(entry.get("ts") or 0.0)
-        occurred_at = datetime.fromtimestamp(ts, tz=UTC) if ts else datetime.now(tz=UTC)
-        run_key = entry.get("run_id")
-        run_status = None
-        if run_key:
-            run_record = trading_storage.get_run(run_key)
-            if run_record:
-                run_status = run_record.get("status")
-        explorer_url = _derive_explorer_url(entry)
-        items.append(
-            HistoryEvent(
-                id=str(entry.get("id") or ""),
-                action=str(entry.get("action") or "unknown"),
-                run_id=run_key,
-                ts=ts,
-                occurred_at=occurred_at,
-                payload=entry,
-                explorer_url=explorer_url,
-                run_status=run_status,
-            )
+        run_digest = _run_digest(run_id)
+        records = [record for record in records if record[3] == run_digest]
+
+    if before_ts is not None:
+        records = _records_before(audit_path, records, before_ts, before_id)
+        page_entries, has_more = _select_page(audit_path, records, 0, limit)
+        return HistoryResponse(
+            items=_build_events(page_entries),
+            offset=0,
+            limit=limit,
+            next_cursor=_cursor_after(page_entries[-1]) if has_more else None,
         )
 
-    return HistoryResponse(items=items, total=total, offset=offset, limit=limit)
+    total = len(records)
+    page_entries, has_more = _select_page(audit_path, records, offset, limit)
+    next_cursor = _cursor_after(page_entries[-1]) if has_more else None
+
+    return HistoryResponse(
+        items=_build_events(page_entries),
+        total=total,
+        offset=offset,
+        limit=limit,
+        next_cursor=next_cursor,
+    )
+
+
+def _record_ts(record: tuple[float, int, int, bytes]) -> float:
+    return record[0]
+
+
+def _select_page(
+    audit_path: Path,
+    records: list[tuple[float, int, int, bytes]],
+    skip: int,
+    limit: int,
+) -> tuple[list[dict], bool]:
+    """Return entries ``skip`` to ``skip + limit`` in ``_sort_key`` order, newest first,
+    and whether older ones follow.
+
+    The log is not assumed to be in timestamp order (callers stamp entries, and worker
+    threads can append them late), so a bounded heap selects the page from the index.
+    The index holds no ids: records tied with the page's edge timestamps are read back
+    and ordered by (ts, id) like cursors.
+    """
+
+    top = heapq.nlargest(skip + limit + 1, records, key=_record_ts)
+    if len(top) <= skip:
+        return [], False
+    newest = top[skip][0]
+    oldest = top[-1][0]
+    preceding = 0
+    candidates = []
+    for record in records:
+        ts = record[0]
+        if ts > newest:
+            preceding += 1
+        elif ts >= oldest:
+            candidates.append(record)
+    entries = _read_entries(audit_path, candidates)
+    entries.sort(key=_sort_key, reverse=True)
+    start = skip - preceding
+    return entries[start : start + limit], len(top) > skip + limit
+
+
+def _records_before(
+    audit_path: Path,
+    records: list[tuple[float, int, int, bytes]],
+    before_ts: float,
+    before_id: str | None,
+) -> list[tuple[float, int, int, bytes]]:
+    """Keep the records that sort after the cursor ``(before_ts, before_id)``."""
+
+    older = [record for record in records if record[0] < before_ts]
+    if before_id is not None:
+        tied = [record for record in records if record[0] == before_ts]
+        # Indexed lines all parse, so entries line up with their records.
+        older += [
+            record
+            for record, entry in zip(tied, _read_entries(audit_path, tied))
+            if _sort_key(entry)[1] < before_id
+        ]
+    return older
 
 
 def _derive_explorer_url(entry: dict) -> str | None:
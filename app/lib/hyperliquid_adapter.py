@@ -3,22 +3,69 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import AbstractAsyncContextManager
 from dataclasses import dataclass
-from decimal import Decimal, ROUND_DOWN, ROUND_UP
-from typing import Any
+from decimal import Decimal, ROUND_DOWN
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Any, Awaitable
 
-from eth_account import Account
-from eth_account.signers.local import LocalAccount
-from hyperliquid.exchange import Exchange
-from hyperliquid.info import Info
+import httpx
+import orjson
 
 from app.lib.logger import get_logger
 from app.lib.metrics import METRICS
 
+if TYPE_CHECKING:
+    from eth_account.signers.local import LocalAccount
+
 
 logger = get_logger(__name__)
 
+# Blocking SDK calls (signing + sync HTTP) get their own bounded pool so a burst of
+# orders cannot starve the default executor used by the rest of the app.
+_SDK_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hl-sdk")
+
+# Mid prices are reused within one order/position flow instead of refetched per lookup.
+_MIDS_TTL_SECONDS = 0.5
+
+# Shared zero for empty position fields; Decimals are immutable.
+_ZERO = Decimal(0)
+
+
+# Decoded agent accounts keyed by a digest of the private key, so repeated client
+# constructions skip the secp256k1 public-key derivation in Account.from_key. Like the
+# decrypted-key cache in app.authz.storage, an entry is kept for 30 seconds at most.
+_ACCOUNT_TTL_SECONDS = 30.0
+_ACCOUNT_CACHE: dict[bytes, tuple[float, LocalAccount]] = {}
+
+
+def _local_account(private_key: str) -> LocalAccount:
+    from eth_account import Account
+
+    now = time.monotonic()
+    for stale in [key for key, (expires, _) in _ACCOUNT_CACHE.items() if expires <= now]:
+        _ACCOUNT_CACHE.pop(stale, None)
+    cache_key = hashlib.sha256(private_key.encode("utf-8")).digest()
+    cached = _ACCOUNT_CACHE.get(cache_key)
+    if cached is not None:
+        return cached[1]
+    account = Account.from_key(private_key)
+    _ACCOUNT_CACHE[cache_key] = (now + _ACCOUNT_TTL_SECONDS, account)
+    return account
+
+
+@lru_cache(maxsize=64)
+def _asset_name_for(market: str) -> str:
+    # Markets are a small fixed set, so each name is parsed once per process.
+    if market.endswith("-PERP"):
+        return market[:-5]
+    if "-" in market:
+        return market.split("-", 1)[0]
+    return market
+
 
 @dataclass
 class ExchangeCredentials:
@@ -33,18 +80,33 @@ class HyperliquidExchangeClient(AbstractAsyncContextManager["HyperliquidExchange
     """Thin async wrapper around the Hyperliquid Python SDK."""
 
     def __init__(self, credentials: ExchangeCredentials, *, base_url: str, skip_ws: bool = True) -> None:
+        # The SDK pulls in eth_account/web3 (~250 ms, tens of MB); import it only
+        # once a client is actually needed rather than when the app boots.
+        from hyperliquid.exchange import Exchange
+        from hyperliquid.info import Info
+
         self._credentials = credentials
         self._base_url = base_url
-        self._loop = asyncio.get_event_loop()
 
         self._info = Info(base_url, skip_ws)
-        wallet: LocalAccount = Account.from_key(credentials.private_key)
+        wallet = _local_account(credentials.private_key)
         self._account_address = credentials.account_address or wallet.address
         self._exchange = Exchange(
             wallet,
             base_url=base_url,
             account_address=self._account_address,
         )
+        # Market name -> (asset id, size decimals), fixed for the lifetime of the Info metadata.
+        self._asset_table: dict[str, tuple[int, int]] = {
+            name: (asset_id, self._info.asset_to_sz_decimals.get(asset_id, 8))
+            for name, coin in self._info.name_to_coin.items()
+            if (asset_id := self._info.coin_to_asset.get(coin)) is not None
+        }
+        # Read-only Info queries go straight over pooled async HTTP; the SDK (sync
+        # requests) is kept for metadata and signed exchange actions.
+        self._http = httpx.AsyncClient(base_url=base_url, timeout=5.0)
+        self._mids_cache: tuple[float, dict[str, Any]] | None = None
+        self._mids_lock = asyncio.Lock()
 
     async def __aenter__(self) -> "HyperliquidExchangeClient":
         return self
@@ -91,12 +153,24 @@ class HyperliquidExchangeClient(AbstractAsyncContextManager["HyperliquidExchange
         )
         return response
 
-    async def place_market_order(self, market: str, usd_notional: float) -> dict[str, Any]:
-        """Submit a market order sized by USD notional."""
+    async def place_market_order(
+        self,
+        market: str,
+        usd_notional: float,
+        *,
+        after: Awaitable[Any] | None = None,
+    ) -> dict[str, Any]:
+        """Submit a market order sized by USD notional.
+
+        ``after`` is awaited once the order is sized and before it is submitted, so a
+        prerequisite request (e.g. the leverage update) overlaps the price lookup.
+        """
 
         is_buy = usd_notional >= 0
         absolute_notional = abs(Decimal(str(usd_notional)))
         size, mark_px, computed_notional = await self._calculate_size(market, absolute_notional)
+        if after is not None:
+            await after
 
         asset = self._resolve_asset_name(market)
 
@@ -148,23 +222,21 @@ class HyperliquidExchangeClient(AbstractAsyncContextManager["HyperliquidExchange
         asset = self._resolve_asset_name(market)
 
         try:
-            open_orders = await self._run_in_executor(self._info.open_orders, self._account_address)
+            open_orders = await self._info_post({"type": "openOrders", "user": self._account_address})
         except Exception:  # pragma: no cover - network failures
             METRICS.increment("hl.requests.cancel_error")
             logger.exception("hl_cancel_orders_error", extra={"market": market, "stage": "open_orders"})
             raise
 
-        cancel_requests: list[dict[str, Any]] = []
-        if isinstance(open_orders, list):
-            for order in open_orders:
-                if not isinstance(order, dict):
-                    continue
-                if order.get("coin") != asset:
-                    continue
-                oid = order.get("oid")
-                if oid is None:
-                    continue
-                cancel_requests.append({"coin": asset, "oid": int(oid)})
+        cancel_requests: list[dict[str, Any]] = (
+            [
+                {"coin": asset, "oid": int(order["oid"])}
+                for order in open_orders
+                if isinstance(order, dict) and order.get("coin") == asset and order.get("oid") is not None
+            ]
+            if isinstance(open_orders, list)
+            else []
+        )
 
         if not cancel_requests:
             logger.info("hl_cancel_orders_skip", extra={"market": market, "reason": "no_open_orders"})
@@ -211,6 +283,26 @@ class HyperliquidExchangeClient(AbstractAsyncContextManager["HyperliquidExchange
         logger.info("hl_close_position_success", extra={"market": market, "response": response})
         return response
 
+    async def cancel_and_close(self, market: str) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Cancel open orders and then close the position for ``market``.
+
+        The two are signed actions for the same agent, whose nonces the SDK derives from
+        millisecond timestamps, so they are sent one after the other; concurrent sends
+        could share a nonce and have one rejected. The close is attempted even if the
+        cancel fails, and the cancel failure is raised afterwards.
+        """
+
+        try:
+            cancelled = await self.cancel_open_orders(market)
+        except Exception as exc:
+            cancel_error: Exception | None = exc
+        else:
+            cancel_error = None
+        closed = await self.close_position(market)
+        if cancel_error is not None:
+            raise cancel_error
+        return cancelled, closed
+
     async def usd_send(self, destination: str, amount: float) -> dict[str, Any]:
         METRICS.increment("hl.requests.usd_send_attempt")
         logger.info(
@@ -285,33 +377,35 @@ class HyperliquidExchangeClient(AbstractAsyncContextManager["HyperliquidExchange
     async def close(self) -> None:
         if getattr(self._info, "ws_manager", None) is not None:
             self._info.disconnect_websocket()
+        await self._http.aclose()
 
     async def get_perp_position(self, market: str) -> dict[str, Decimal]:
         asset = self._resolve_asset_name(market)
 
-        state = await self._run_in_executor(self._info.user_state, self._account_address)
+        state, mark_price = await asyncio.gather(
+            self._info_post({"type": "clearinghouseState", "user": self._account_address}),
+            self._get_mark_price(asset, default=_ZERO),
+        )
         asset_positions = state.get("assetPositions", []) if isinstance(state, dict) else []
 
-        mark_price = await self._get_mark_price(asset, default=Decimal("0"))
-
         for entry in asset_positions:
             position = entry.get("position") if isinstance(entry, dict) else None
             if not position or position.get("coin") != asset:
                 continue
 
             size_str = position.get("szi")
-            size = Decimal(str(size_str)) if size_str is not None else Decimal("0")
+            size = Decimal(str(size_str)) if size_str is not None else _ZERO
             if size == 0:
                 break
 
             entry_px = position.get("entryPx")
-            entry_price = Decimal(str(entry_px)) if entry_px is not None else Decimal("0")
+            entry_price = Decimal(str(entry_px)) if entry_px is not None else _ZERO
 
             realized = position.get("realizedPnl")
             unrealized = position.get("unrealizedPnl")
 
-            realized_pnl = Decimal(str(realized)) if realized is not None else Decimal("0")
-            unrealized_pnl = Decimal(str(unrealized)) if unrealized is not None else Decimal("0")
+            realized_pnl = Decimal(str(realized)) if realized is not None else _ZERO
+            unrealized_pnl = Decimal(str(unrealized)) if unrealized is not None else _ZERO
 
             position_notional = abs(size) * mark_price
 
@@ -324,19 +418,17 @@ class HyperliquidExchangeClient(AbstractAsyncContextManager["HyperliquidExchange
             }
 
         return {
-            "position_notional": Decimal("0"),
-            "entry_price": Decimal("0"),
+            "position_notional": _ZERO,
+            "entry_price": _ZERO,
             "mark_price": mark_price,
-            "realized_pnl": Decimal("0"),
-            "unrealized_pnl": Decimal("0"),
+            "realized_pnl": _ZERO,
+            "unrealized_pnl": _ZERO,
         }
 
     async def _calculate_size(self, market: str, usd_notional: Decimal) -> Decimal:
         asset_name = self._resolve_asset_name(market)
         mark_px = await self._get_mark_price(asset_name)
-        asset_id = self._info.name_to_asset(asset_name)
-        decimals = self._info.asset_to_sz_decimals.get(asset_id, 8)
-        quantizer = Decimal(1).scaleb(-decimals)
+        asset_id, sz_decimals = self._asset_table[asset_name]
 
         min_notional = self._resolve_min_notional(asset_id)
         if usd_notional < min_notional:
@@ -349,23 +441,29 @@ class HyperliquidExchangeClient(AbstractAsyncContextManager["HyperliquidExchange
                 },
             )
 
-        raw_size = usd_notional / mark_px
-        size = raw_size.quantize(quantizer, rounding=ROUND_UP)
-        if size <= 0:
+        # Size in 10**-sz_decimals units, rounded up: exact integer ceil-division over the
+        # rational values of notional and price instead of variable-precision Decimal division.
+        notional_num, notional_den = usd_notional.as_integer_ratio()
+        px_num, px_den = mark_px.as_integer_ratio()
+        size_units = -(-notional_num * px_den * 10**sz_decimals // (notional_den * px_num))
+        if size_units <= 0:
             raise ValueError("Order size rounded to zero; increase usd_notional")
+        size = Decimal(size_units).scaleb(-sz_decimals)
 
         computed_notional = size * mark_px
         return size, mark_px, computed_notional
 
+    async def _info_post(self, body: dict[str, Any]) -> Any:
+        response = await self._http.post("/info", json=body)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
     async def _run_in_executor(self, func, *args, **kwargs):
-        return await self._loop.run_in_executor(None, lambda: func(*args, **kwargs))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_SDK_EXECUTOR, partial(func, *args, **kwargs))
 
     def _resolve_asset_name(self, market: str) -> str:
-        if market.endswith("-PERP"):
-            return market[:-5]
-        if "-" in market:
-            return market.split("-", 1)[0]
-        return market
+        return _asset_name_for(market)
 
     @staticmethod
     def _extract_order_errors(response: Any) -> list[str]:
@@ -401,9 +499,24 @@ class HyperliquidExchangeClient(AbstractAsyncContextManager["HyperliquidExchange
         # Conservative default matches public docs ($10)
         return Decimal("10")
 
+    async def _all_mids(self) -> dict[str, Any]:
+        cached = self._mids_cache
+        if cached is not None and time.monotonic() - cached[0] < _MIDS_TTL_SECONDS:
+            return cached[1]
+        # Concurrent callers wait on the lock and reuse the refresh made by the first.
+        async with self._mids_lock:
+            cached = self._mids_cache
+            if cached is not None and time.monotonic() - cached[0] < _MIDS_TTL_SECONDS:
+                return cached[1]
+            all_mids = await self._info_post({"type": "allMids"})
+            if not isinstance(all_mids, dict):
+                all_mids = {}
+            self._mids_cache = (time.monotonic(), all_mids)
+            return all_mids
+
     async def _get_mark_price(self, asset: str, *, default: Decimal | None = None) -> Decimal:
-        all_mids = await self._run_in_executor(self._info.all_mids)
-        value = all_mids.get(asset) if isinstance(all_mids, dict) else None
+        all_mids = await self._all_mids()
+        value = all_mids.get(asset)
         if value is None:
             if default is not None:
                 return default
@@ -419,3 +532,56 @@ class HyperliquidAPIError(RuntimeError):
         self.response = response
         message = f"Hyperliquid {action} failed: {response}"
         super().__init__(message)
+
+
+# Long-lived clients keyed by (agent address, account address, base URL). Building one
+# loads exchange metadata and opens fresh connections, so it happens once per agent and
+# event loop; a client whose key was rotated or whose loop has gone is replaced.
+_CLIENTS: dict[tuple[str, str | None, str], tuple[asyncio.AbstractEventLoop, HyperliquidExchangeClient]] = {}
+# Replaced or evicted clients may still be held by a running monitor or request, so
+# they are only closed at shutdown.
+_RETIRED_CLIENTS: list[tuple[asyncio.AbstractEventLoop, HyperliquidExchangeClient]] = []
+
+
+async def get_client(credentials: ExchangeCredentials, base_url: str) -> HyperliquidExchangeClient:
+    """Return the shared client for ``credentials``; callers must not close it."""
+
+    loop = asyncio.get_running_loop()
+    key = (credentials.address, credentials.account_address, base_url)
+    cached = _CLIENTS.get(key)
+    if cached is not None:
+        client_loop, client = cached
+        if client_loop is loop and client._credentials == credentials:
+            return client
+        del _CLIENTS[key]
+        if client_loop is loop:
+            _RETIRED_CLIENTS.append(cached)
+    # Construction does not await, so concurrent callers cannot both miss the cache.
+    client = HyperliquidExchangeClient(credentials, base_url=base_url)
+    _CLIENTS[key] = (loop, client)
+    return client
+
+
+def evict_agent(agent_address: str) -> None:
+    """Drop the cached account and shared clients of a deleted agent."""
+
+    address = agent_address.lower()
+    for cache_key, (_, account) in list(_ACCOUNT_CACHE.items()):
+        if account.address.lower() == address:
+            _ACCOUNT_CACHE.pop(cache_key, None)
+    for key in [key for key in _CLIENTS if key[0].lower() == address]:
+        cached = _CLIENTS.pop(key, None)
+        if cached is not None:
+            _RETIRED_CLIENTS.append(cached)
+
+
+async def close_clients() -> None:
+    """Close every shared client created on the running loop (application shutdown)."""
+
+    loop = asyncio.get_running_loop()
+    clients = [*_CLIENTS.values(), *_RETIRED_CLIENTS]
+    _CLIENTS.clear()
+    _RETIRED_CLIENTS.clear()
+    for client_loop, client in clients:
+        if client_loop is loop:
+            await client.close()
@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
 from typing import Any, Dict
 
 import httpx
+import orjson
 
 from app.lib.logger import get_logger
 
@@ -15,6 +18,10 @@ class InfoClientError(RuntimeError):
 
 logger = get_logger(__name__)
 
+# Upper bound on a decoded Info response body. Bodies are read incrementally and the
+# request is abandoned once this is exceeded instead of buffering without limit.
+_MAX_RESPONSE_BYTES = 16 << 20
+
 
 class InfoClient:
     """Thin wrapper for calling Hyperliquid's Info endpoint."""
@@ -22,6 +29,18 @@ class InfoClient:
     def __init__(self, base_url: str, *, timeout: float = 10.0) -> None:
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        # One pooled client per InfoClient keeps connections (and TLS sessions) alive
+        # across balance polls instead of handshaking on every request.
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0),
+        )
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+
+        await self._client.aclose()
 
     async def fetch_balances(self, address: str) -> dict[str, Any]:
         """Fetch user balances for the provided Hyperliquid address.
@@ -30,26 +49,35 @@ class InfoClient:
         """
 
         spot_payload = {"type": "spotClearinghouseState", "user": address}
-        spot_data = await self._post_info(address, spot_payload, "spot")
-
         clearinghouse_payload: Dict[str, Any] = {
             "type": "clearinghouseState",
             "user": address,
         }
 
-        result: dict[str, Any] = dict(spot_data)
-
-        try:
-            clearinghouse_data = await self._post_info(address, clearinghouse_payload, "perp")
-        except InfoClientError as exc:
-            logger.info(
-                "hyperliquid.info.request.skip",
-                extra={
-                    "address": address,
-                    "scope": "perp",
-                    "reason": str(exc),
-                },
-            )
+        # Both requests are independent; run them together so a refresh costs one round trip.
+        spot_data, clearinghouse_data = await asyncio.gather(
+            self._post_info(address, spot_payload, "spot"),
+            self._post_info(address, clearinghouse_payload, "perp"),
+            return_exceptions=True,
+        )
+        if isinstance(spot_data, BaseException):
+            raise spot_data
+
+        # _post_info decodes a fresh dict per call, so it can be extended in place.
+        result: dict[str, Any] = spot_data
+
+        if isinstance(clearinghouse_data, InfoClientError):
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "hyperliquid.info.request.skip",
+                    extra={
+                        "address": address,
+                        "scope": "perp",
+                        "reason": str(clearinghouse_data),
+                    },
+                )
+        elif isinstance(clearinghouse_data, BaseException):
+            raise clearinghouse_data
         else:
             result["clearinghouseState"] = clearinghouse_data
         return result
@@ -57,14 +85,13 @@ class InfoClient:
     async def _post_info(self, address: str, payload: dict[str, Any], scope: str) -> dict[str, Any]:
         """Perform POST /info with payload and return JSON dict."""
 
-        try:
+        if logger.isEnabledFor(logging.INFO):
             logger.info(
                 "hyperliquid.info.request",
                 extra={"address": address, "base_url": self.base_url, "scope": scope},
             )
-            async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout) as client:
-                response = await client.post("/info", json=payload)
-                response.raise_for_status()
+        try:
+            body = await self._read_info_body(payload)
         except httpx.HTTPStatusError as exc:  # pragma: no cover - exercised via exception path tests
             status = exc.response.status_code
             try:
@@ -92,20 +119,38 @@ class InfoClient:
             raise InfoClientError("Hyperliquid Info request failed (network)") from exc
 
         try:
-            data = response.json()
-        except ValueError as exc:  # pragma: no cover
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError as exc:  # pragma: no cover
             raise InfoClientError("Invalid JSON returned from Hyperliquid Info") from exc
 
         if not isinstance(data, dict):
             raise InfoClientError("Unexpected Info response shape")
 
-        logger.info(
-            "hyperliquid.info.request.summary",
-            extra={
-                "address": address,
-                "scope": scope,
-                "keys": sorted(data.keys()),
-            },
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "hyperliquid.info.request.summary",
+                extra={
+                    "address": address,
+                    "scope": scope,
+                    "keys": sorted(data.keys()),
+                },
+            )
 
         return data
+
+    async def _read_info_body(self, payload: dict[str, Any]) -> bytes:
+        """POST /info and return the raw body, refusing responses over the size cap."""
+
+        async with self._client.stream("POST", "/info", json=payload) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            declared = response.headers.get("content-length", "")
+            if declared.isdigit() and int(declared) > _MAX_RESPONSE_BYTES:
+                raise InfoClientError("Hyperliquid Info response too large")
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) > _MAX_RESPONSE_BYTES:
+                    raise InfoClientError("Hyperliquid Info response too large")
+            return bytes(body)
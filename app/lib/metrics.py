@@ -3,18 +3,23 @@
 from __future__ import annotations
 
 import threading
-from collections import Counter
 from typing import Dict
 
 
 class MetricsRegistry:
+    """Process-local counters.
+
+    ``increment`` is lock-free: every caller runs on the event loop thread, so the
+    read-modify-write cannot interleave. The lock only guards snapshots and resets.
+    """
+
     def __init__(self) -> None:
         self._lock = threading.Lock()
-        self._counters: Counter[str] = Counter()
+        self._counters: Dict[str, int] = {}
 
     def increment(self, name: str, value: int = 1) -> None:
-        with self._lock:
-            self._counters[name] += value
+        counters = self._counters
+        counters[name] = counters.get(name, 0) + value
 
     def snapshot(self) -> Dict[str, int]:
         with self._lock:
@@ -4,47 +4,65 @@ from __future__ import annotations
 
 import threading
 import time
-from typing import Dict, Tuple
+from typing import Dict, List
 
 from fastapi import HTTPException, Request
 
 
+_SHARD_COUNT = 16
+
+
 class RateLimiter:
-    """Enforces a maximum number of events per window per key."""
+    """Enforces a maximum number of events per window per key.
+
+    Keys are spread over independently locked shards so concurrent requests for
+    different keys rarely contend. Each entry is a mutable ``[count, window_start]``
+    pair updated in place.
+    """
 
     def __init__(self) -> None:
-        self._lock = threading.Lock()
-        self._entries: Dict[str, Tuple[int, float]] = {}
+        self._shards: List[tuple[Dict[str, List[float]], threading.Lock]] = [
+            ({}, threading.Lock()) for _ in range(_SHARD_COUNT)
+        ]
 
     def allow(self, key: str, limit: int, window_seconds: int = 60) -> bool:
         if limit <= 0:
             return True
         now = time.monotonic()
-        with self._lock:
-            count, window_start = self._entries.get(key, (0, now))
-            if now - window_start >= window_seconds:
-                count = 0
-                window_start = now
-            if count >= limit:
+        entries, lock = self._shards[hash(key) & (_SHARD_COUNT - 1)]
+        with lock:
+            entry = entries.get(key)
+            if entry is None or now - entry[1] >= window_seconds:
+                entries[key] = [1, now]
+                return True
+            if entry[0] >= limit:
                 return False
-            self._entries[key] = (count + 1, window_start)
+            entry[0] += 1
             return True
 
     def reset(self) -> None:
-        with self._lock:
-            self._entries.clear()
+        for entries, lock in self._shards:
+            with lock:
+                entries.clear()
 
 
 def enforce_rate_limit(request: Request, scope: str) -> None:
-    rate_limiter: RateLimiter | None = getattr(request.app.state, "rate_limiter", None)  # type: ignore[attr-defined]
-    limit: int = getattr(request.app.state, "rate_limit_per_minute", 0)  # type: ignore[attr-defined]
-    if rate_limiter is None or limit <= 0:
-        return
-
-    base = request.session.get("wallet_address")  # type: ignore[arg-type]
-    if not base:
-        client = getattr(request, "client", None)
-        base = getattr(client, "host", "anonymous")
-    key = f"{scope}:{base}"
-    if not rate_limiter.allow(key, limit):
+    # The limiter, limit and client key are resolved once per request and reused by
+    # any further scope checks made while handling it.
+    cached: tuple[RateLimiter, int, str] | None = getattr(request.state, "_rate_limit_ctx", None)
+    if cached is None:
+        rate_limiter: RateLimiter | None = getattr(request.app.state, "rate_limiter", None)  # type: ignore[attr-defined]
+        limit: int = getattr(request.app.state, "rate_limit_per_minute", 0)  # type: ignore[attr-defined]
+        if rate_limiter is None or limit <= 0:
+            return
+
+        base = request.session.get("wallet_address")  # type: ignore[arg-type]
+        if not base:
+            client = getattr(request, "client", None)
+            base = getattr(client, "host", "anonymous")
+        cached = (rate_limiter, limit, base)
+        request.state._rate_limit_ctx = cached
+
+    rate_limiter, limit, base = cached
+    if not rate_limiter.allow(f"{scope}:{base}", limit):
         raise HTTPException(status_code=429, detail="Too many requests")
@@ -1,20 +1,26 @@
 """FastAPI application entrypoint for the Hyperliquid bot skeleton (Phases 0-1)."""
 
-from datetime import UTC, datetime
-from typing import Any
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
 
 from fastapi import FastAPI
 from fastapi.requests import Request
-from fastapi.responses import JSONResponse, Response, FileResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from starlette.middleware.gzip import GZipMiddleware
 from starlette.middleware.sessions import SessionMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from app.paths import STATIC_DIR, TEMPLATES_DIR
+from app.paths import STATIC_DIR
+from app.authz import storage as auth_storage
 from app.authz.routes import router as authz_router
+from app.common.web import TEMPLATES, current_year, wallet_context
 from app.config import get_settings
-from app.deposit.routes import router as deposit_router
+from app.deposit.routes import close_info_client, router as deposit_router
 from app.trading.routes import router as trading_router
+from app.trading import storage as trading_storage
 from app.trading.service import get_start_overview
 from app.trading.ui import router as trading_ui_router
 from app.trading.constants import (
@@ -27,6 +33,7 @@ from app.monitoring import MonitoringHub, router as monitoring_router, Monitorin
 from app.transfers.routes import router as transfers_router
 from app.withdraw.routes import router as withdraw_router
 from app.history.routes import router as history_router
+from app.lib.hyperliquid_adapter import close_clients as close_hyperliquid_clients
 from app.lib.logger import configure_logging
 from app.lib.metrics import METRICS
 from app.lib.rate_limiter import RateLimiter
@@ -34,18 +41,94 @@ from app.lib.rate_limiter import RateLimiter
 settings = get_settings()
 
 configure_logging()
-app = FastAPI(title="Hyperliquid Bot", version="0.3.0")
+
+
+@asynccontextmanager
+async def lifespan(app_: FastAPI) -> AsyncIterator[None]:
+    """Run background writers for the lifetime of the server process."""
+
+    auth_storage.migrate_legacy_owners(settings.legacy_owner_wallet)
+    auth_storage.compact_agents()
+    trading_storage.compact_runs()
+    background = [
+        asyncio.create_task(auth_storage.run_audit_writer()),
+        asyncio.create_task(app_.state.monitoring_service.run_tick_flusher()),
+    ]
+    try:
+        yield
+    finally:
+        for task in background:
+            task.cancel()
+        for task in background:
+            with suppress(asyncio.CancelledError):
+                await task
+        await close_info_client()
+        await close_hyperliquid_clients()
+
+
+class _GZipExceptStreams:
+    """Gzip responses of at least ``minimum_size`` bytes, leaving SSE streams untouched.
+
+    Starlette's GZipMiddleware buffers inside the compressor, which would hold
+    server-sent events back until enough bytes accumulate.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000) -> None:
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not scope["path"].endswith("/stream"):
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+app = FastAPI(
+    title="Hyperliquid Bot",
+    version="0.3.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 app.add_middleware(
     SessionMiddleware,
     secret_key=settings.secret_key_salt,
     same_site="lax",
     https_only=settings.hl_env == "prod",
 )
+app.add_middleware(_GZipExceptStreams, minimum_size=1000)
+
+templates = TEMPLATES
+
+# Page context that only depends on settings and constants, built once at import.
+_ROOT_BASE_CTX = {
+    "page_title": "Hyperliquid Bot",
+    "walletconnect_project_id": settings.walletconnect_project_id,
+    "hl_env": settings.hl_env,
+    "nav_active": "overview",
+    "markets": DEFAULT_MARKETS,
+    "default_notional": DEFAULT_NOTIONAL,
+    "default_leverage": DEFAULT_LEVERAGE,
+    "default_duration_minutes": DEFAULT_DURATION_MINUTES,
+    "form_values": {
+        "market": DEFAULT_MARKETS[0],
+        "usd_notional": str(DEFAULT_NOTIONAL),
+        "leverage": str(DEFAULT_LEVERAGE),
+        "duration_minutes": str(DEFAULT_DURATION_MINUTES),
+    },
+    "form_errors": {},
+    "form_success": None,
+}
+_AUTHZ_AGENT_BASE_CTX = {
+    "page_title": "Authorize agent wallet",
+    "walletconnect_project_id": settings.walletconnect_project_id,
+    "hl_env": settings.hl_env,
+    "nav_active": "agent",
+    "agent_deep_link": "https://app.hyperliquid.xyz/API",
+}
 
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
-app.state.templates = templates
 app.state.monitoring_hub = MonitoringHub()
 app.state.monitoring_service = MonitoringService(app.state.monitoring_hub)
 app.state.metrics = METRICS
@@ -85,54 +168,34 @@ async def chrome_devtools_probe() -> Response:
     return Response(status_code=204)
 
 
-@app.get("/favicon.ico", include_in_schema=False)
-async def favicon() -> FileResponse:
-    """Serve the Hyperliquid Bot favicon."""
-
-    return FileResponse(STATIC_DIR / "favicon.svg", media_type="image/svg+xml")
-
-
-def _wallet_context(session: dict[str, Any]) -> dict[str, Any]:
-    """Assemble wallet-related context for templates."""
+_FAVICON_BYTES = (STATIC_DIR / "favicon.svg").read_bytes()
+_FAVICON_HEADERS = {
+    "Cache-Control": "public, max-age=86400",
+    "ETag": f'"{hashlib.md5(_FAVICON_BYTES).hexdigest()}"',
+}
 
-    wallet_address: str | None = session.get("wallet_address")
-    if not wallet_address:
-        return {"wallet_address": None, "wallet_address_short": None}
 
-    short = f"{wallet_address[:6]}…{wallet_address[-4:]}"
-    return {"wallet_address": wallet_address, "wallet_address_short": short}
+@app.get("/favicon.ico", include_in_schema=False)
+async def favicon(request: Request) -> Response:
+    """Serve the Hyperliquid Bot favicon from memory."""
 
+    if request.headers.get("if-none-match") == _FAVICON_HEADERS["ETag"]:
+        return Response(status_code=304, headers=_FAVICON_HEADERS)
+    return Response(content=_FAVICON_BYTES, media_type="image/svg+xml", headers=_FAVICON_HEADERS)
 
-app.state.wallet_context_builder = _wallet_context
 
 @app.get("/", tags=["ui"], summary="Root landing page")
 async def root(request: Request):
     """Render landing page including wallet connect state."""
 
-    start_overview = get_start_overview()
-    form_defaults = {
-        "market": DEFAULT_MARKETS[0],
-        "usd_notional": str(DEFAULT_NOTIONAL),
-        "leverage": str(DEFAULT_LEVERAGE),
-        "duration_minutes": str(DEFAULT_DURATION_MINUTES),
-    }
-
+    # The overview may replay the runs log from disk; keep that off the event loop.
+    start_overview = await asyncio.to_thread(get_start_overview)
     context = {
+        **_ROOT_BASE_CTX,
         "request": request,
-        "page_title": "Hyperliquid Bot",
-        "current_year": datetime.now(tz=UTC).year,
-        "walletconnect_project_id": settings.walletconnect_project_id,
-        "hl_env": settings.hl_env,
-        "nav_active": "overview",
-        "markets": DEFAULT_MARKETS,
-        "default_notional": DEFAULT_NOTIONAL,
-        "default_leverage": DEFAULT_LEVERAGE,
-        "default_duration_minutes": DEFAULT_DURATION_MINUTES,
+        "current_year": current_year(),
         "start_overview": start_overview,
-        "form_values": form_defaults,
-        "form_errors": {},
-        "form_success": None,
-        **_wallet_context(request.session),
+        **wallet_context(request.session),
     }
     return templates.TemplateResponse(request, "index.html", context)
 
@@ -142,12 +205,8 @@ async def agent_authorization(request: Request):
     """Render the agent authorization instructions page."""
 
     context = {
-        "page_title": "Authorize agent wallet",
-        "current_year": datetime.now(tz=UTC).year,
-        "walletconnect_project_id": settings.walletconnect_project_id,
-        "hl_env": settings.hl_env,
-        "nav_active": "agent",
-        "agent_deep_link": "https://app.hyperliquid.xyz/API",
-        **_wallet_context(request.session),
+        **_AUTHZ_AGENT_BASE_CTX,
+        "current_year": current_year(),
+        **wallet_context(request.session),
     }
     return templates.TemplateResponse(request, "authz/agent.html", context)
@@ -3,16 +3,22 @@
 from __future__ import annotations
 
 import asyncio
+from collections import defaultdict
 from typing import AsyncIterator
 
 from app.monitoring.schemas import BotPnLSnapshot
 
+# Per-subscriber backlog cap. A slow consumer loses its oldest snapshots rather than
+# growing without bound; each snapshot is a full state, so newer ones supersede them.
+_SUBSCRIBER_QUEUE_SIZE = 64
+
 
 class MonitoringHub:
     """Broadcast snapshots to interested subscribers via async queues."""
 
     def __init__(self) -> None:
-        self._subscribers: list[_Subscriber] = []
+        # Subscribers keyed by the run they follow; ``None`` holds the all-runs listeners.
+        self._by_run: defaultdict[str | None, set[_Subscriber]] = defaultdict(set)
         self._snapshots: dict[str, BotPnLSnapshot] = {}
         self._lock = asyncio.Lock()
 
@@ -21,15 +27,14 @@ class MonitoringHub:
 
         async with self._lock:
             self._snapshots[snapshot.run_id] = snapshot
-            subscribers = list(self._subscribers)
+            subscribers = [*self._by_run.get(snapshot.run_id, ()), *self._by_run.get(None, ())]
         for subscriber in subscribers:
-            if subscriber.run_id is None or subscriber.run_id == snapshot.run_id:
-                await subscriber.queue.put(snapshot)
+            subscriber.offer(snapshot)
 
     async def listen(self, run_id: str | None = None) -> AsyncIterator[BotPnLSnapshot]:
         """Yield snapshots for the provided run identifier (or all runs if None)."""
 
-        subscriber = _Subscriber(asyncio.Queue(), run_id)
+        subscriber = _Subscriber(asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE_SIZE), run_id)
         await self._register(subscriber)
         try:
             while True:
@@ -41,18 +46,18 @@ class MonitoringHub:
     async def latest(self, run_id: str) -> BotPnLSnapshot | None:
         """Return the last known snapshot for a run."""
 
-        async with self._lock:
-            return self._snapshots.get(run_id)
+        # Reads skip the lock: the hub lives on one event loop and there is no await
+        # between looking up and returning, so a writer cannot interleave.
+        return self._snapshots.get(run_id)
 
     async def list_snapshots(self) -> list[BotPnLSnapshot]:
         """Return last known snapshots for all runs (unordered)."""
 
-        async with self._lock:
-            return list(self._snapshots.values())
+        return list(self._snapshots.values())
 
     async def _register(self, subscriber: "_Subscriber") -> None:
         async with self._lock:
-            self._subscribers.append(subscriber)
+            self._by_run[subscriber.run_id].add(subscriber)
             snapshots: list[BotPnLSnapshot] = []
             if subscriber.run_id is None:
                 snapshots = list(self._snapshots.values())
@@ -61,22 +66,37 @@ class MonitoringHub:
                 if snapshot is not None:
                     snapshots = [snapshot]
         for snapshot in snapshots:
-            await subscriber.queue.put(snapshot)
+            subscriber.offer(snapshot)
 
     async def _unregister(self, subscriber: "_Subscriber") -> None:
         async with self._lock:
-            if subscriber in self._subscribers:
-                self._subscribers.remove(subscriber)
+            subscribers = self._by_run.get(subscriber.run_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._by_run[subscriber.run_id]
 
     async def reset(self) -> None:
         """Clear all stored snapshots and subscribers (testing utility)."""
 
         async with self._lock:
             self._snapshots.clear()
-            self._subscribers.clear()
+            self._by_run.clear()
 
 
 class _Subscriber:
     def __init__(self, queue: "asyncio.Queue[BotPnLSnapshot]", run_id: str | None) -> None:
         self.queue: "asyncio.Queue[BotPnLSnapshot]" = queue
         self.run_id = run_id
+
+    def offer(self, snapshot: BotPnLSnapshot) -> None:
+        """Enqueue without blocking, dropping the oldest snapshot when full."""
+
+        try:
+            self.queue.put_nowait(snapshot)
+        except asyncio.QueueFull:
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            self.queue.put_nowait(snapshot)
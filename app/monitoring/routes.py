@@ -2,20 +2,78 @@
 
 from __future__ import annotations
 
+import asyncio
 from typing import AsyncIterator, Any
-import json
-from datetime import UTC, datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
 
+from app.common.web import TEMPLATES, current_year, wallet_context
 from app.monitoring.hub import MonitoringHub
 from app.monitoring.service import MonitoringService
-from app.monitoring.schemas import MonitoringEnvelope
+from app.monitoring.schemas import BotPnLSnapshot, MonitoringEnvelope
 
 router = APIRouter()
 
+# A burst of snapshots is sent as one chunk: after the first event, keep collecting
+# for up to _SSE_LINGER_SECONDS or until _SSE_MAX_BATCH events (or
+# _SSE_MAX_BATCH_BYTES) are buffered.
+_SSE_MAX_BATCH = 16
+_SSE_MAX_BATCH_BYTES = 1 << 20
+_SSE_LINGER_SECONDS = 0.05
+
+
+# The SSE framing and the constant {"ok": true, "data": ...} envelope are pre-encoded;
+# the snapshot body is encoded once and shared by every subscriber.
+_SSE_PREFIX = b'data: {"ok":true,"data":'
+_SSE_SUFFIX = b"}\n\n"
+
+
+def _encode_event(snapshot: BotPnLSnapshot) -> bytes:
+    return _SSE_PREFIX + snapshot.json_bytes() + _SSE_SUFFIX
+
+
+async def _sse_chunks(snapshots: AsyncIterator[BotPnLSnapshot]) -> AsyncIterator[bytes]:
+    """Encode snapshots as SSE events, coalescing bursts into a single chunk."""
+
+    # The pending __anext__ runs as a task that survives a linger timeout: cancelling
+    # it would close the underlying listener generator.
+    pending: asyncio.Future[BotPnLSnapshot] | None = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(snapshots))
+            try:
+                snapshot = await pending
+            except StopAsyncIteration:
+                pending = None
+                return
+            pending = None
+            buffer = [_encode_event(snapshot)]
+            size = len(buffer[0])
+            exhausted = False
+            while len(buffer) < _SSE_MAX_BATCH and size < _SSE_MAX_BATCH_BYTES:
+                pending = asyncio.ensure_future(anext(snapshots))
+                done, _ = await asyncio.wait((pending,), timeout=_SSE_LINGER_SECONDS)
+                if not done:
+                    break
+                ready, pending = pending, None
+                try:
+                    buffer.append(_encode_event(ready.result()))
+                    size += len(buffer[-1])
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+            yield b"".join(buffer)
+            if exhausted:
+                return
+    finally:
+        if pending is not None:
+            # The generator counts as running until the cancelled __anext__ unwinds.
+            pending.cancel()
+            await asyncio.wait((pending,))
+        await snapshots.aclose()
+
 
 async def get_monitoring_hub(request: Request) -> MonitoringHub:
     hub: MonitoringHub | None = getattr(request.app.state, "monitoring_hub", None)
@@ -33,59 +91,40 @@ def get_monitoring_service(request: Request, hub: MonitoringHub = Depends(get_mo
 
 
 @router.get("/runs/{run_id}/snapshot")
-async def get_run_snapshot(run_id: str, service: MonitoringService = Depends(get_monitoring_service)) -> JSONResponse:
+async def get_run_snapshot(run_id: str, service: MonitoringService = Depends(get_monitoring_service)) -> ORJSONResponse:
     snapshot = await service.get_snapshot(run_id)
     if snapshot is None:
         raise HTTPException(status_code=404, detail="Run snapshot not found")
     # Ensure JSON-serializable payload
-    return JSONResponse({"ok": True, "data": snapshot.json_payload()})
+    return ORJSONResponse({"ok": True, "data": snapshot.json_payload()})
 
 
 @router.get("/runs/{run_id}/stream")
 async def stream_run(run_id: str, hub: MonitoringHub = Depends(get_monitoring_hub)) -> StreamingResponse:
-    async def event_source() -> AsyncIterator[bytes]:
-        async for snapshot in hub.listen(run_id):
-            payload = {"ok": True, "data": snapshot.json_payload()}
-            yield f"data: {json.dumps(payload)}\n\n".encode("utf-8")
-
-    return StreamingResponse(event_source(), media_type="text/event-stream")
+    return StreamingResponse(_sse_chunks(hub.listen(run_id)), media_type="text/event-stream")
 
 
 @router.get("/stream")
 async def stream_all(hub: MonitoringHub = Depends(get_monitoring_hub)) -> StreamingResponse:
-    async def event_source() -> AsyncIterator[bytes]:
-        async for snapshot in hub.listen():
-            payload = {"ok": True, "data": snapshot.json_payload()}
-            yield f"data: {json.dumps(payload)}\n\n".encode("utf-8")
-
-    return StreamingResponse(event_source(), media_type="text/event-stream")
+    return StreamingResponse(_sse_chunks(hub.listen()), media_type="text/event-stream")
 
 
 # -------- UI routes ---------
 
-def _templates(request: Request) -> Jinja2Templates:
-    templates: Jinja2Templates = request.app.state.templates  # type: ignore[attr-defined]
-    return templates
-
-
 @router.get("/", response_class=HTMLResponse)
 async def monitoring_dashboard(request: Request, hub: MonitoringHub = Depends(get_monitoring_hub)) -> HTMLResponse:
     """Render realtime monitoring dashboard with SSE-powered updates."""
 
     snapshots = await hub.list_snapshots()
-    # Wallet context (optional)
-    builder = getattr(request.app.state, "wallet_context_builder", None)  # type: ignore[attr-defined]
-    wallet_ctx = builder(request.session) if callable(builder) else {"wallet_address": None, "wallet_address_short": None}
-
     context: dict[str, Any] = {
         "request": request,
         "page_title": "Realtime Monitor",
         "nav_active": "monitoring",
-        "current_year": datetime.now(tz=UTC).year,
+        "current_year": current_year(),
         "snapshots": snapshots,
-        **wallet_ctx,
+        **wallet_context(request.session),
     }
-    return _templates(request).TemplateResponse("monitoring/dashboard.html", context)
+    return TEMPLATES.TemplateResponse("monitoring/dashboard.html", context)
 
 
 @router.get("/partial/table", response_class=HTMLResponse)
@@ -97,4 +136,4 @@ async def monitoring_table_partial(request: Request, hub: MonitoringHub = Depend
         "request": request,
         "snapshots": snapshots,
     }
-    return _templates(request).TemplateResponse("monitoring/_rows.html", context)
+    return TEMPLATES.TemplateResponse("monitoring/_rows.html", context)
@@ -6,7 +6,10 @@ from datetime import UTC, datetime
 from decimal import Decimal
 from typing import Literal
 
-from pydantic import BaseModel, Field, field_validator
+import orjson
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
+
+from app.common.encoding import json_datetime
 
 
 class BotPnLSnapshot(BaseModel):
@@ -22,6 +25,9 @@ class BotPnLSnapshot(BaseModel):
     realized_pnl: Decimal = Field(default=Decimal("0"))
     unrealized_pnl: Decimal = Field(default=Decimal("0"))
 
+    _json_bytes: bytes | None = PrivateAttr(default=None)
+    _json_prefix: bytes | None = PrivateAttr(default=None)
+
     @field_validator("market")
     @classmethod
     def normalize_market(cls, value: str) -> str:
@@ -32,9 +38,46 @@ class BotPnLSnapshot(BaseModel):
         return self.realized_pnl + self.unrealized_pnl
 
     def json_payload(self) -> dict[str, object]:
-        """Return JSON-serializable payload."""
+        """Return JSON-serializable payload (same shape as ``model_dump(mode="json")``)."""
+
+        return {"run_id": self.run_id, "market": self.market, **self._json_tail()}
+
+    def _json_tail(self) -> dict[str, object]:
+        return {
+            "timestamp": json_datetime(self.timestamp),
+            "status": self.status,
+            "position_notional": str(self.position_notional),
+            "entry_price": str(self.entry_price),
+            "mark_price": str(self.mark_price),
+            "realized_pnl": str(self.realized_pnl),
+            "unrealized_pnl": str(self.unrealized_pnl),
+            "total_pnl": str(self.total_pnl),
+        }
+
+    def use_json_prefix(self, prefix: bytes) -> None:
+        """Reuse a pre-encoded ``run_id``/``market`` prefix from :func:`json_prefix`."""
+
+        self._json_prefix = prefix
+
+    def json_bytes(self) -> bytes:
+        """Return ``json_payload()`` encoded with orjson, computed once per snapshot.
+
+        Published snapshots are never mutated (updates build a new instance), so every
+        stream subscriber can share the same encoding.
+        """
+
+        if self._json_bytes is None:
+            if self._json_prefix is None:
+                self._json_bytes = orjson.dumps(self.json_payload())
+            else:
+                self._json_bytes = self._json_prefix + b"," + orjson.dumps(self._json_tail())[1:]
+        return self._json_bytes
+
+
+def json_prefix(run_id: str, market: str) -> bytes:
+    """Encode the fields a run never changes as an open JSON object, ``{"run_id":..,"market":..``."""
 
-        return self.model_dump(mode="json") | {"total_pnl": str(self.total_pnl)}
+    return orjson.dumps({"run_id": run_id, "market": market})[:-1]
 
 
 class MonitoringEnvelope(BaseModel):
@@ -3,33 +3,110 @@
 from __future__ import annotations
 
 import asyncio
+import sys
+import time
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from decimal import Decimal
 from typing import Any
 
+from app.lib.metrics import METRICS
 from app.monitoring.hub import MonitoringHub
-from app.monitoring.schemas import BotPnLSnapshot
+from app.monitoring.schemas import BotPnLSnapshot, json_prefix
 from app.trading.schemas import BotRunRecord
 
-_DECIMAL_FIELDS = {
-    "position_notional",
-    "entry_price",
-    "mark_price",
-    "realized_pnl",
-    "unrealized_pnl",
-}
+_DECIMAL_FIELDS = frozenset(
+    {
+        "position_notional",
+        "entry_price",
+        "mark_price",
+        "realized_pnl",
+        "unrealized_pnl",
+    }
+)
+
+# Snapshot fields mirrored on _MonitoringContext, resolved once at import.
+_STATE_FIELDS = tuple(BotPnLSnapshot.model_fields)
 
 
 def _to_decimal(value: Any) -> Decimal:
     if isinstance(value, Decimal):
         return value
+    # str() gives a float's shortest round-trip form (0.1 -> "0.1"), not its binary
+    # expansion, and no precision is cut off as a fixed-point unit would.
     return Decimal(str(value))
 
 
-@dataclass
+def _market_coin(market: str) -> str | None:
+    """Return the coin of a ``COIN-SUFFIX`` market (BTC-PERP -> BTC), if it has one."""
+
+    coin, separator, _ = market.partition("-")
+    return sys.intern(coin) if separator else None
+
+
+@dataclass(slots=True)
 class _MonitoringContext:
+    """Mutable per-run state, updated in place and turned into a snapshot on publish."""
+
+    run_id: str
+    timestamp: float  # epoch seconds; the datetime is only built when materialising
+    market: str
+    status: str
+    position_notional: Decimal
+    entry_price: Decimal
+    mark_price: Decimal
+    realized_pnl: Decimal
+    unrealized_pnl: Decimal
     snapshot: BotPnLSnapshot
+    # Derived once at registration: the coin this run's market-tick updates arrive under.
+    coin: str | None = None
+    # run_id and market never change, so their JSON encoding is built once per run.
+    json_prefix: bytes = b""
+
+    @classmethod
+    def from_snapshot(cls, snapshot: BotPnLSnapshot) -> "_MonitoringContext":
+        state = {name: getattr(snapshot, name) for name in _STATE_FIELDS}
+        for name in _DECIMAL_FIELDS:
+            state[name] = _to_decimal(state[name])
+        state["timestamp"] = snapshot.timestamp.timestamp()
+        return cls(
+            snapshot=snapshot,
+            coin=_market_coin(snapshot.market),
+            json_prefix=json_prefix(snapshot.run_id, snapshot.market),
+            **state,
+        )
+
+    def materialize(self) -> BotPnLSnapshot:
+        """Build the published snapshot from current state without re-validating it.
+
+        Values are validated on registration and coerced by ``update_snapshot``.
+        """
+
+        state = {name: getattr(self, name) for name in _STATE_FIELDS}
+        state["timestamp"] = datetime.fromtimestamp(self.timestamp, tz=UTC)
+        snapshot = BotPnLSnapshot.model_construct(**state)
+        if self.json_prefix:
+            snapshot.use_json_prefix(self.json_prefix)
+        self.snapshot = snapshot
+        return snapshot
+
+
+# Market ticks queued through queue_coin_update are merged per coin and applied every
+# _TICK_FLUSH_SECONDS; at most _PENDING_COINS_MAX coins wait, oldest dropped first.
+_TICK_FLUSH_SECONDS = 0.05
+_PENDING_COINS_MAX = 1024
+
+# Runs in these states no longer receive market-driven updates.
+_TERMINAL_STATUSES = frozenset({"completed", "stopped", "closed", "cancelled", "failed"})
+
+
+def _apply_updates(context: _MonitoringContext, updates: dict[str, Any]) -> BotPnLSnapshot:
+    for field, value in updates.items():
+        if value is None:
+            continue
+        setattr(context, field, _to_decimal(value) if field in _DECIMAL_FIELDS else value)
+    context.timestamp = time.time()
+    return context.materialize()
 
 
 class MonitoringService:
@@ -38,23 +115,33 @@ class MonitoringService:
     def __init__(self, hub: MonitoringHub) -> None:
         self._hub = hub
         self._contexts: dict[str, _MonitoringContext] = {}
+        # Live run ids per market coin, so price ticks only touch the runs they affect.
+        self._by_coin: dict[str, set[str]] = {}
+        self._pending_ticks: dict[str, dict[str, Any]] = {}
         self._lock = asyncio.Lock()
 
     async def register_run(self, record: BotRunRecord) -> BotPnLSnapshot:
         """Register a new bot run and publish an initial snapshot."""
 
-        snapshot = BotPnLSnapshot(
+        # The record was validated when the run was created, so the snapshot is built
+        # without re-running validators; only the market normalisation is applied here.
+        snapshot = BotPnLSnapshot.model_construct(
             run_id=record.run_id,
-            market=record.market,
+            timestamp=datetime.now(tz=UTC),
+            market=record.market.upper(),
             status=record.status,
-            position_notional=_to_decimal(record.usd_notional),
+            position_notional=record.usd_notional,
             entry_price=Decimal("0"),
             mark_price=Decimal("0"),
             realized_pnl=Decimal("0"),
             unrealized_pnl=Decimal("0"),
         )
         async with self._lock:
-            self._contexts[record.run_id] = _MonitoringContext(snapshot=snapshot)
+            context = _MonitoringContext.from_snapshot(snapshot)
+            snapshot.use_json_prefix(context.json_prefix)
+            self._contexts[record.run_id] = context
+            if context.coin is not None and snapshot.status not in _TERMINAL_STATUSES:
+                self._by_coin.setdefault(context.coin, set()).add(record.run_id)
         await self._hub.publish(snapshot)
         return snapshot
 
@@ -65,20 +152,84 @@ class MonitoringService:
             context = self._contexts.get(run_id)
             if context is None:
                 raise KeyError(f"Unknown run_id '{run_id}'")
-
-            payload: dict[str, Any] = {}
-            for field, value in updates.items():
-                if field in _DECIMAL_FIELDS and value is not None:
-                    payload[field] = _to_decimal(value)
-                elif value is not None:
-                    payload[field] = value
-            payload["timestamp"] = datetime.now(tz=UTC)
-            snapshot = context.snapshot.model_copy(update=payload)
-            context.snapshot = snapshot
+            snapshot = _apply_updates(context, updates)
+            if context.status in _TERMINAL_STATUSES:
+                self._drop_from_coin_index(run_id, context.coin)
 
         await self._hub.publish(snapshot)
         return snapshot
 
+    async def update_by_coin(self, coin: str, **updates: Any) -> list[BotPnLSnapshot]:
+        """Apply ``updates`` to every live run trading ``coin`` and broadcast the results.
+
+        Market ticks do not wait for the lock: if it is already held the tick goes back
+        into the pending queue for the next flush (fields a newer tick has set since are
+        kept), since the flusher already took it out. Updates made through
+        ``update_snapshot`` (status changes, position polls) always wait.
+        """
+
+        if self._lock.locked():
+            METRICS.increment("monitoring.tick.shed")
+            self._requeue_tick(coin.upper(), updates)
+            return []
+        async with self._lock:
+            run_ids = self._by_coin.get(coin.upper())
+            if not run_ids:
+                return []
+            snapshots = [_apply_updates(self._contexts[run_id], updates) for run_id in run_ids]
+
+        for snapshot in snapshots:
+            await self._hub.publish(snapshot)
+        return snapshots
+
+    def queue_coin_update(self, coin: str, **updates: Any) -> None:
+        """Queue a market tick for ``coin``; newer values overwrite pending ones.
+
+        Must be called on the event loop thread. ``run_tick_flusher`` applies the
+        merged updates, so a burst of ticks costs one publish per run per interval.
+        """
+
+        pending = self._pending_ticks
+        coin = coin.upper()
+        merged = pending.pop(coin, None)
+        if merged is None:
+            if len(pending) >= _PENDING_COINS_MAX:
+                del pending[next(iter(pending))]
+                METRICS.increment("monitoring.tick.dropped")
+            merged = {}
+        merged.update(updates)
+        pending[coin] = merged
+
+    def _requeue_tick(self, coin: str, updates: dict[str, Any]) -> None:
+        pending = self._pending_ticks
+        merged = pending.get(coin)
+        if merged is None:
+            if len(pending) >= _PENDING_COINS_MAX:
+                METRICS.increment("monitoring.tick.dropped")
+                return
+            pending[coin] = dict(updates)
+            return
+        for field, value in updates.items():
+            merged.setdefault(field, value)
+
+    async def run_tick_flusher(self, interval: float = _TICK_FLUSH_SECONDS) -> None:
+        """Apply queued market ticks every ``interval`` seconds until cancelled."""
+
+        while True:
+            await asyncio.sleep(interval)
+            if not self._pending_ticks:
+                continue
+            batch, self._pending_ticks = self._pending_ticks, {}
+            for coin, updates in batch.items():
+                await self.update_by_coin(coin, **updates)
+
+    def _drop_from_coin_index(self, run_id: str, coin: str | None) -> None:
+        run_ids = self._by_coin.get(coin) if coin is not None else None
+        if run_ids is not None:
+            run_ids.discard(run_id)
+            if not run_ids:
+                del self._by_coin[coin]
+
     async def mark_status(self, run_id: str, status: str) -> BotPnLSnapshot:
         """Helper to mark a run status change."""
 
@@ -10,8 +10,11 @@ and stopped explicitly (not auto-started) to avoid unexpected side effects.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import sys
 import threading
+from functools import partial
 from typing import Callable
 
 try:
@@ -22,6 +25,14 @@ except Exception:  # pragma: no cover - environment guard
 from app.monitoring.service import MonitoringService
 
 
+def _fnum(value: object) -> float:
+    """Return ``value`` as a float; numeric prices pass straight through, empty ones are 0."""
+
+    if type(value) is float:
+        return value
+    return float(value) if value else 0.0
+
+
 class HLSubscriber:
     """Manage Hyperliquid WS subscriptions and publish updates to MonitoringService."""
 
@@ -31,11 +42,17 @@ class HLSubscriber:
         self._ws = WebsocketManager(base_url)
         self._service = service
         self._thread: threading.Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
         self._running = False
 
     def start(self) -> None:
+        """Start the websocket thread; must be called from the application's event loop."""
+
         if self._running:
             return
+        # Callbacks run on the websocket thread and hand ticks to this loop without
+        # waiting for it.
+        self._loop = asyncio.get_running_loop()
         self._running = True
         self._thread = self._ws
         self._thread.daemon = True
@@ -59,31 +76,25 @@ class HLSubscriber:
         {"channel":"bbo","data":{"coin":"BTC","bid":...,"ask":...}}
         """
 
+        # Messages on this subscription are all for one coin, so the key is derived once.
+        coin_key = sys.intern(coin.upper())
+
         def on_bbo(msg: dict) -> None:
             try:
                 data = msg.get("data") or {}
-                coin_name = str(data.get("coin", "")).upper()
-                bid = float(data.get("bid") or 0)
-                ask = float(data.get("ask") or 0)
+                bid = _fnum(data.get("bid", 0.0))
+                ask = _fnum(data.get("ask", 0.0))
                 mark = (bid + ask) / 2 if (bid and ask) else (bid or ask or 0)
-                # Update all snapshots whose market starts with this coin name
-                # (e.g., BTC-PERP -> BTC)
-                prefix = f"{coin_name}-"
-                # We iterate via service snapshots to avoid requiring run ids here
-                # Note: list_snapshots is a light copy
-                # mypy: async loop required
-                import anyio  # type: ignore
-
-                async def _update():
-                    for snap in await self._service.list_snapshots():
-                        if str(snap.market).upper().startswith(prefix):
-                            await self._service.update_snapshot(snap.run_id, mark_price=mark)
-
-                anyio.from_thread.run(_update)
+                # Queue the tick for every live run trading this coin (e.g., BTC-PERP -> BTC)
+                loop = self._loop
+                if loop is not None and not loop.is_closed():
+                    loop.call_soon_threadsafe(
+                        partial(self._service.queue_coin_update, coin_key, mark_price=mark)
+                    )
             except Exception:
                 logging.exception("bbo callback failed")
 
-        sub = {"type": "bbo", "coin": coin.upper()}
+        sub = {"type": "bbo", "coin": coin_key}
         return self._ws.subscribe(sub, on_bbo)
 
     # Future: subscribe to user/account channels (requires auth routing)
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, BackgroundTasks, Depends, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from app.trading.schemas import BotStartRequest, BotStartResponse, BotStopRequest, BotStopResponse
 from app.trading.service import start_bot_run, stop_bot_run
@@ -20,7 +20,7 @@ async def start_bot_endpoint(
     payload: BotStartRequest,
     background_tasks: BackgroundTasks,
     monitoring: MonitoringService = Depends(get_monitoring_service),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Start a trading bot by placing initial orders and recording the run."""
 
     enforce_rate_limit(request, "bot.start")
@@ -34,8 +34,8 @@ async def start_bot_endpoint(
         active_agent_address=active_agent_address,
     )
     await monitoring.register_run(record)
-    response_payload = BotStartResponse.from_record(record).model_dump(mode="json")
-    return JSONResponse({"ok": True, "data": response_payload})
+    response_payload = BotStartResponse.from_record(record).json_payload()
+    return ORJSONResponse({"ok": True, "data": response_payload})
 
 
 @router.post("/stop")
@@ -43,10 +43,10 @@ async def stop_bot_endpoint(
     request: Request,
     payload: BotStopRequest,
     monitoring: MonitoringService = Depends(get_monitoring_service),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Stop a trading bot run by cancelling orders and closing position."""
 
     enforce_rate_limit(request, "bot.stop")
     result = await stop_bot_run(payload, monitoring)
-    response_payload = BotStopResponse.from_record(**result).model_dump(mode="json")
-    return JSONResponse({"ok": True, "data": response_payload})
+    response_payload = BotStopResponse.from_record(**result).json_payload()
+    return ORJSONResponse({"ok": True, "data": response_payload})
@@ -4,9 +4,11 @@ from __future__ import annotations
 
 from datetime import UTC, datetime
 from decimal import Decimal
-from typing import Literal
+from typing import Annotated, Literal
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, StringConstraints, field_validator
+
+from app.common.encoding import json_datetime
 
 
 VALID_LEVERAGE_RANGE = range(1, 51)
@@ -15,16 +17,12 @@ VALID_LEVERAGE_RANGE = range(1, 51)
 class BotStartRequest(BaseModel):
     """Input payload for starting a trading bot run."""
 
-    market: str = Field(..., min_length=3, max_length=32)
+    # Stripped and upper-cased by pydantic-core rather than a Python validator.
+    market: Annotated[str, StringConstraints(strip_whitespace=True, to_upper=True, min_length=3, max_length=32)]
     usd_notional: Decimal = Field(..., gt=Decimal("0"))
     leverage: int = Field(...)
     duration_minutes: float = Field(default=15.0, gt=0.0, le=240.0)
 
-    @field_validator("market")
-    @classmethod
-    def normalize_market(cls, value: str) -> str:
-        return value.strip().upper()
-
     @field_validator("leverage")
     @classmethod
     def validate_leverage(cls, value: int) -> int:
@@ -46,6 +44,14 @@ class BotRunRecord(BaseModel):
     started_at: datetime
     duration_minutes: float
 
+    def to_dict(self) -> dict[str, object]:
+        """Return field values as a plain dict (``model_dump()`` without the schema walk)."""
+
+        return {name: getattr(self, name) for name in _RUN_RECORD_FIELDS}
+
+
+_RUN_RECORD_FIELDS = tuple(BotRunRecord.model_fields)
+
 
 class BotStartResponse(BaseModel):
     """Success response for bot start endpoint."""
@@ -59,7 +65,8 @@ class BotStartResponse(BaseModel):
 
     @classmethod
     def from_record(cls, record: BotRunRecord) -> "BotStartResponse":
-        return cls(
+        # The record is already validated; copy its fields without re-validating.
+        return cls.model_construct(
             run_id=record.run_id,
             status=record.status,
             market=record.market,
@@ -68,6 +75,18 @@ class BotStartResponse(BaseModel):
             started_at=record.started_at,
         )
 
+    def json_payload(self) -> dict[str, object]:
+        """Return JSON-serializable payload (same shape as ``model_dump(mode="json")``)."""
+
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "market": self.market,
+            "usd_notional": str(self.usd_notional),
+            "leverage": self.leverage,
+            "started_at": json_datetime(self.started_at),
+        }
+
 
 class BotStopRequest(BaseModel):
     """Payload for stopping an active bot run."""
@@ -85,4 +104,15 @@ class BotStopResponse(BaseModel):
 
     @classmethod
     def from_record(cls, *, run_id: str, market: str, status: str, closed_at: datetime) -> "BotStopResponse":
-        return cls(run_id=run_id, market=market, status=status, closed_at=closed_at)
+        # Built from the stored run and a server-side timestamp; skip validation.
+        return cls.model_construct(run_id=run_id, market=market, status=status, closed_at=closed_at)
+
+    def json_payload(self) -> dict[str, object]:
+        """Return JSON-serializable payload (same shape as ``model_dump(mode="json")``)."""
+
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "market": self.market,
+            "closed_at": json_datetime(self.closed_at),
+        }
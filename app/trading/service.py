@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import asyncio
-import secrets
+import heapq
 from datetime import UTC, datetime, timedelta
 from decimal import Decimal, InvalidOperation
 from typing import Any
@@ -16,35 +16,60 @@ from app.lib.hyperliquid_adapter import (
     ExchangeCredentials,
     HyperliquidAPIError,
     HyperliquidExchangeClient,
+    get_client,
 )
 from app.trading import storage as trading_storage
 from app.trading.schemas import BotRunRecord, BotStartRequest
 from app.trading.schemas import BotStopRequest
 from app.monitoring.service import MonitoringService
+from app.lib.ids import next_id
 from app.lib.logger import get_logger
 from app.lib.metrics import METRICS
 
 
 logger = get_logger(__name__)
 
+# Settings are fixed for the life of the process (see get_settings), so bind them once.
+settings = get_settings()
+
 _RUN_MONITOR_TASKS: dict[str, asyncio.Task[None]] = {}
+# Set by stop_bot_run to wake a run's monitor and end it at its next checkpoint.
+_STOP_EVENTS: dict[str, asyncio.Event] = {}
 _MONITOR_POLL_SECONDS = 5.0
+# Caps simultaneous position polls across all runs, keeping many-run deployments under
+# Hyperliquid's rate limits and the HTTP client's connection pool. Created on first use
+# inside the running loop, and again if a later loop (a new test, a restart) needs it.
+_MONITOR_SEMAPHORE: tuple[asyncio.AbstractEventLoop, asyncio.Semaphore] | None = None
+
+
+def _monitor_semaphore() -> asyncio.Semaphore:
+    global _MONITOR_SEMAPHORE
+    loop = asyncio.get_running_loop()
+    if _MONITOR_SEMAPHORE is None or _MONITOR_SEMAPHORE[0] is not loop:
+        _MONITOR_SEMAPHORE = (loop, asyncio.Semaphore(settings.max_concurrent_monitors))
+    return _MONITOR_SEMAPHORE[1]
 
 
 def _select_agent(wallet_address: str | None, preferred_agent: str | None) -> dict[str, Any]:
     normalized_preferred = auth_storage.normalize_address(preferred_agent)
 
     candidates = auth_storage.agents_for_wallet(wallet_address) if wallet_address else []
-    if not candidates:
+    owned = bool(candidates)
+    if not owned:
         candidates = auth_storage.load_agents()
 
     if not candidates:
         raise HTTPException(status_code=400, detail="No agent wallet registered")
 
     if normalized_preferred:
-        for entry in candidates:
-            if auth_storage.normalize_address(entry.get("agent_address")) == normalized_preferred:
-                return entry
+        # Indexed lookup; the preferred agent only counts if it is one of the candidates.
+        entry = auth_storage.get_agent(normalized_preferred)
+        if entry is not None and (
+            not owned
+            or auth_storage.normalize_address(entry.get("owner_wallet"))
+            == auth_storage.normalize_address(wallet_address)
+        ):
+            return entry
 
     return candidates[0]
 
@@ -53,20 +78,30 @@ def _decrypt_private_key(agent_entry: dict[str, Any]) -> str:
     cipher = agent_entry.get("key_cipher")
     if not cipher:
         raise HTTPException(status_code=400, detail="Agent entry missing key cipher")
-    fernet = auth_storage.get_fernet()
     try:
-        return fernet.decrypt(cipher.encode("utf-8")).decode("utf-8")
+        return auth_storage.decrypt_agent_key(cipher)
     except Exception as exc:  # pragma: no cover - defensive
         raise HTTPException(status_code=500, detail="Unable to decrypt agent key") from exc
 
 
 def _serialize_record(record: BotRunRecord) -> dict[str, Any]:
-    data = record.model_dump()
+    data = record.to_dict()
     data["started_at"] = record.started_at.isoformat()
     data["usd_notional"] = str(record.usd_notional)
     return data
 
 
+def _persist_start(run_payload: dict[str, Any], audit_entry: dict[str, Any]) -> None:
+    try:
+        trading_storage.append_run(run_payload)
+    except Exception:
+        # The response has already gone out, so the failure can only be logged; the
+        # staged entry must not keep answering lookups for a run that was never stored.
+        trading_storage.discard_staged_run(run_payload["run_id"])
+        logger.exception("run_persist_failed", extra={"run_id": run_payload["run_id"]})
+    auth_storage.append_audit(audit_entry)
+
+
 async def start_bot_run(
     payload: BotStartRequest,
     wallet_address: str,
@@ -79,18 +114,16 @@ async def start_bot_run(
 
     agent_entry = _select_agent(wallet_address, active_agent_address)
     _assert_agent_available(agent_entry["agent_address"])
-    private_key = _decrypt_private_key(agent_entry)
-
-    settings = get_settings()
-    client = HyperliquidExchangeClient(
-        ExchangeCredentials(
-            agent_entry["agent_address"],
-            private_key,
-            account_address=agent_entry.get("owner_wallet"),
-        ),
-        base_url=settings.hl_rest_base,
+    # Built once: the monitor task gets the same credentials, so its get_client call
+    # resolves to the client cached here instead of opening another connection.
+    credentials = ExchangeCredentials(
+        agent_entry["agent_address"],
+        _decrypt_private_key(agent_entry),
+        account_address=agent_entry.get("owner_wallet"),
     )
 
+    client = await get_client(credentials, settings.hl_rest_base)
+
     METRICS.increment("bot.start.attempt")
     logger.info(
         "bot_start_attempt",
@@ -102,8 +135,18 @@ async def start_bot_run(
         },
     )
     try:
-        await client.set_isolated_leverage(payload.market, payload.leverage)
-        await client.place_market_order(payload.market, float(payload.usd_notional))
+        # Leverage must be in place before the order is submitted, but the order's price
+        # lookup and sizing need not wait for it.
+        leverage = asyncio.ensure_future(
+            client.set_isolated_leverage(payload.market, payload.leverage)
+        )
+        try:
+            await client.place_market_order(
+                payload.market, float(payload.usd_notional), after=leverage
+            )
+        finally:
+            # Sizing can fail before the leverage result is awaited; settle it either way.
+            await asyncio.gather(leverage, return_exceptions=True)
     except HyperliquidAPIError as exc:
         METRICS.increment("bot.start.error")
         logger.warning(
@@ -116,10 +159,8 @@ async def start_bot_run(
             },
         )
         raise HTTPException(status_code=502, detail=str(exc)) from exc
-    finally:
-        await client.close()
 
-    run_id = secrets.token_hex(16)
+    run_id = next_id()
     started_at = datetime.now(tz=UTC)
     record = BotRunRecord(
         run_id=run_id,
@@ -135,10 +176,9 @@ async def start_bot_run(
 
     run_payload = _serialize_record(record)
     run_payload["end_at"] = (started_at + timedelta(minutes=payload.duration_minutes)).isoformat()
-    trading_storage.append_run(run_payload)
 
     audit_entry = {
-        "id": secrets.token_hex(16),
+        "id": next_id(),
         "ts": started_at.timestamp(),
         "action": "bot_started",
         "run_id": run_id,
@@ -146,15 +186,14 @@ async def start_bot_run(
         "wallet_address": wallet_address,
         "agent_address": agent_entry["agent_address"],
     }
-    auth_storage.append_audit(audit_entry)
+    # The run is staged in memory so lookups and the agent guard see it immediately;
+    # both file writes happen after the response is sent.
+    trading_storage.stage_run(run_payload)
+    background_tasks.add_task(_persist_start, run_payload, audit_entry)
 
-    credentials = ExchangeCredentials(
-        agent_entry["agent_address"],
-        private_key,
-        account_address=agent_entry.get("owner_wallet"),
-    )
     await monitoring.register_run(record)
 
+    stop_event = _STOP_EVENTS[run_id] = asyncio.Event()
     _schedule_monitor_task(
         run_id,
         _monitor_run(
@@ -164,6 +203,7 @@ async def start_bot_run(
             credentials=credentials,
             base_url=settings.hl_rest_base,
             monitoring=monitoring,
+            stop_event=stop_event,
         ),
     )
 
@@ -192,35 +232,31 @@ async def stop_bot_run(
     if run_entry.get("status") not in {"running", "completed"}:
         raise HTTPException(status_code=400, detail="Run is not active")
 
-    agents = auth_storage.load_agents()
-    agent_address = run_entry.get("agent_address")
-    agent_entry = next((a for a in agents if a.get("agent_address") == agent_address), None)
+    agent_entry = auth_storage.get_agent(run_entry.get("agent_address"))
     if not agent_entry:
         raise HTTPException(status_code=400, detail="Agent wallet unavailable")
 
     private_key = _decrypt_private_key(agent_entry)
 
-    settings = get_settings()
-    client = HyperliquidExchangeClient(
+    client = await get_client(
         ExchangeCredentials(
             agent_entry["agent_address"],
             private_key,
             account_address=agent_entry.get("owner_wallet"),
         ),
-        base_url=settings.hl_rest_base,
+        settings.hl_rest_base,
     )
 
     market = run_entry.get("market")
     if not isinstance(market, str):
         raise HTTPException(status_code=500, detail="Run entry missing market")
 
-    monitor_task = _RUN_MONITOR_TASKS.pop(payload.run_id, None)
-    if monitor_task is not None:
-        monitor_task.cancel()
+    stop_event = _STOP_EVENTS.pop(payload.run_id, None)
+    if stop_event is not None:
+        stop_event.set()
 
     try:
-        await client.cancel_open_orders(market)
-        await client.close_position(market)
+        await client.cancel_and_close(market)
     except HyperliquidAPIError as exc:
         METRICS.increment("bot.stop.error")
         logger.warning(
@@ -228,8 +264,6 @@ async def stop_bot_run(
             extra={"market": market, "action": exc.action, "response": exc.response},
         )
         raise HTTPException(status_code=502, detail=str(exc)) from exc
-    finally:
-        await client.close()
 
     closed_at = datetime.now(tz=UTC)
     trading_storage.update_run(
@@ -246,7 +280,7 @@ async def stop_bot_run(
         )
 
     audit_entry = {
-        "id": secrets.token_hex(16),
+        "id": next_id(),
         "ts": closed_at.timestamp(),
         "action": "bot_stopped",
         "run_id": payload.run_id,
@@ -274,33 +308,80 @@ async def stop_bot_run(
 
 
 def _assert_agent_available(agent_address: str) -> None:
-    runs = trading_storage.load_runs()
-    for entry in runs:
-        if entry.get("agent_address") == agent_address and entry.get("status") in {"running", "starting"}:
-            logger.warning(
-                "agent_nonce_guard_triggered",
-                extra={"agent_address": agent_address, "run_id": entry.get("run_id")},
-            )
-            METRICS.increment("bot.start.nonce_guard")
-            raise HTTPException(status_code=409, detail="Agent already assigned to an active run")
+    run_id = trading_storage.active_agents().get(agent_address)
+    if run_id is not None:
+        logger.warning(
+            "agent_nonce_guard_triggered",
+            extra={"agent_address": agent_address, "run_id": run_id},
+        )
+        METRICS.increment("bot.start.nonce_guard")
+        raise HTTPException(status_code=409, detail="Agent already assigned to an active run")
+
+
+_CENT = Decimal("0.01")
 
 
 def _format_notional(value: Any) -> str:
+    if isinstance(value, Decimal):
+        amount = value
+    else:
+        try:
+            # Stored notionals are strings; only floats go through str() to keep their
+            # shortest repr rather than the exact binary expansion.
+            amount = Decimal(str(value) if isinstance(value, float) else value)
+        except (InvalidOperation, ValueError, TypeError):
+            return str(value)
     try:
-        amount = Decimal(str(value))
-        return f"{amount.quantize(Decimal('0.01')):,.2f}"
-    except (InvalidOperation, ValueError, TypeError):
+        return f"{amount.quantize(_CENT):,.2f}"
+    except InvalidOperation:
         return str(value)
 
 
+_ACTIVE_RUN_STATUSES = frozenset({"running", "starting"})
+
+# limit -> (runs version, run-derived overview fields). Panel polls between writes reuse
+# the formatted rows; metrics and the agent count are always read fresh.
+_OVERVIEW_CACHE: dict[int, tuple[int, dict[str, Any]]] = {}
+
+
 def get_start_overview(limit: int = 5) -> dict[str, Any]:
     """Collect recent runs, metrics, and status for the overview panel."""
 
-    runs = trading_storage.load_runs()
-    sorted_runs = sorted(runs, key=lambda entry: entry.get("started_at", ""), reverse=True)
+    # Read before the runs: a write in between leaves newer rows under an older version,
+    # which only costs a rebuild on the next call.
+    version = trading_storage.runs_version()
+    cached = _OVERVIEW_CACHE.get(limit)
+    if cached is not None and cached[0] == version:
+        run_fields = cached[1]
+    else:
+        run_fields = _summarize_runs(trading_storage.load_runs(), limit)
+        _OVERVIEW_CACHE[limit] = (version, run_fields)
+
+    return {
+        **run_fields,
+        "metrics": METRICS.snapshot(),
+        "agent_count": len(auth_storage.load_agents()),
+    }
+
+
+def _summarize_runs(runs: list[dict[str, Any]], limit: int) -> dict[str, Any]:
+
+    # One pass counts active runs and keeps the `limit` newest in a min-heap, instead of
+    # sorting every run. ISO-8601 UTC start times compare correctly as strings.
+    latest: list[tuple[str, int, dict[str, Any]]] = []
+    active_runs = 0
+    for position, entry in enumerate(runs):
+        if entry.get("status") in _ACTIVE_RUN_STATUSES:
+            active_runs += 1
+        item = (entry.get("started_at") or "", position, entry)
+        if len(latest) < limit:
+            heapq.heappush(latest, item)
+        elif item > latest[0]:
+            heapq.heapreplace(latest, item)
+    latest.sort(reverse=True)
 
     recent_runs: list[dict[str, Any]] = []
-    for entry in sorted_runs[:limit]:
+    for _started_at, _position, entry in latest:
         run_id = entry.get("run_id", "")
         run_id_short = run_id
         if isinstance(run_id, str) and len(run_id) >= 10:
@@ -331,14 +412,8 @@ def get_start_overview(limit: int = 5) -> dict[str, Any]:
             }
         )
 
-    metrics_snapshot = METRICS.snapshot()
-    agent_count = len(auth_storage.load_agents())
-    active_runs = sum(1 for entry in runs if entry.get("status") in {"running", "starting"})
-
     return {
         "recent_runs": recent_runs,
-        "metrics": metrics_snapshot,
-        "agent_count": agent_count,
         "active_runs": active_runs,
         "total_runs": len(runs),
     }
@@ -354,6 +429,7 @@ def _schedule_monitor_task(run_id: str, coro: asyncio.coroutine) -> None:
 
     def _cleanup(_task: asyncio.Task) -> None:
         _RUN_MONITOR_TASKS.pop(run_id, None)
+        _STOP_EVENTS.pop(run_id, None)
         try:
             _task.result()
         except asyncio.CancelledError:
@@ -372,33 +448,30 @@ async def _monitor_run(
     credentials: ExchangeCredentials,
     base_url: str,
     monitoring: MonitoringService,
+    stop_event: asyncio.Event,
 ) -> None:
-    end_at = datetime.now(tz=UTC) + timedelta(minutes=duration_minutes)
-    settings = get_settings()
     poll_seconds = getattr(settings, "monitor_poll_seconds", _MONITOR_POLL_SECONDS)
 
-    async with HyperliquidExchangeClient(credentials, base_url=base_url) as client:
-        while True:
-            # Check current run status
-            run_entry = trading_storage.get_run(run_id)
-            if not run_entry:
-                break
+    # stop_event is only ever set by stop_bot_run; the run's end is a separate timer
+    # flag, so a stop is recognised even while an expired run is retrying its close.
+    deadline_hit = asyncio.Event()
+    deadline = asyncio.get_running_loop().call_later(duration_minutes * 60, deadline_hit.set)
 
-            status = run_entry.get("status")
-            if status in {"closed", "cancelled", "failed"}:
+    try:
+        client = await get_client(credentials, base_url)
+        while not stop_event.is_set():
+            expired = deadline_hit.is_set()
+
+            async with _monitor_semaphore():
+                snapshot = await _fetch_position_snapshot(client, market)
+            if stop_event.is_set():
+                # Stopped while polling; stop_bot_run owns the close and status from here.
                 break
+            await monitoring.update_snapshot(run_id, status="running", **(snapshot or {}))
 
-            snapshot = await _fetch_position_snapshot(client, market)
-            if snapshot is not None:
-                await monitoring.update_snapshot(run_id, status="running", **snapshot)
-            else:
-                await monitoring.update_snapshot(run_id, status="running")
-
-            now = datetime.now(tz=UTC)
-            if now >= end_at:
+            if expired:
                 try:
-                    await client.cancel_open_orders(market)
-                    await client.close_position(market)
+                    await client.cancel_and_close(market)
                 except HyperliquidAPIError as exc:  # pragma: no cover - network failure path
                     logger.warning(
                         "auto_close_failed",
@@ -416,36 +489,33 @@ async def _monitor_run(
                     )
                     await monitoring.mark_status(run_id, "closed")
                     break
+                # Retry the close on the next poll unless the run is stopped meanwhile.
+                await _wait_for_any((stop_event,), poll_seconds)
+            else:
+                await _wait_for_any((stop_event, deadline_hit), poll_seconds)
+    finally:
+        deadline.cancel()
 
-            try:
-                await asyncio.sleep(poll_seconds)
-            except asyncio.CancelledError:
-                break
+
+async def _wait_for_any(events: tuple[asyncio.Event, ...], timeout: float) -> None:
+    """Return once any of ``events`` is set or ``timeout`` seconds have passed."""
+
+    waiters = [asyncio.ensure_future(event.wait()) for event in events]
+    try:
+        await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
 
 
 async def _fetch_position_snapshot(
     client: HyperliquidExchangeClient,
     market: str,
 ) -> dict[str, Any] | None:
+    """Return the adapter's position fields (already Decimals), or None if the poll failed."""
+
     try:
-        position = await client.get_perp_position(market)
+        return await client.get_perp_position(market)
     except Exception:  # pragma: no cover - defensive logging
         logger.exception("position_poll_failed", extra={"market": market})
         return None
-
-    if position is None:
-        return {
-            "position_notional": Decimal("0"),
-            "entry_price": Decimal("0"),
-            "mark_price": Decimal(str(position["mark_price"])) if position else Decimal("0"),
-            "realized_pnl": Decimal("0"),
-            "unrealized_pnl": Decimal("0"),
-        }
-
-    return {
-        "position_notional": position["position_notional"],
-        "entry_price": position["entry_price"],
-        "mark_price": position["mark_price"],
-        "realized_pnl": position["realized_pnl"],
-        "unrealized_pnl": position["unrealized_pnl"],
-    }
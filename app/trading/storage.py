@@ -2,13 +2,63 @@
 
 from __future__ import annotations
 
-import json
+import itertools
+import os
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
+
+import orjson
 
 from app.authz import storage as auth_storage
 
-_RUN_STORAGE_PATH = auth_storage.storage_dir() / "runs.json"
+# Runs are kept in an append-only log: one full record per started run, then
+# {"op": "update", "run_id": ..., <fields>} lines for later changes. The log is replayed
+# into an in-memory index that is reused until the file changes on disk.
+_RUN_STORAGE_PATH = auth_storage.storage_dir() / "runs.jsonl"
+_LEGACY_RUN_STORAGE_PATH = auth_storage.storage_dir() / "runs.json"
+
+# Writes may come from worker threads (sync background tasks), so the index and the
+# file it mirrors are updated together under this lock.
+_RUNS_LOCK = threading.RLock()
+
+# Compact the runs log once update lines exceed this share of live records.
+_COMPACT_RATIO = 0.25
+
+# Runs accepted by the API whose append_run has not landed yet (it runs as a background
+# task after the response). Lookups and the active-agent guard consult these too.
+_PENDING_RUNS: dict[str, dict[str, Any]] = {}
+
+_ACTIVE_STATUSES = frozenset({"running", "starting"})
+
+
+@dataclass
+class _RunIndex:
+    """Replayed runs log keyed by run id, valid for one (mtime_ns, size)."""
+
+    mtime_ns: int
+    size: int
+    by_id: dict[str, dict[str, Any]]
+    stale_lines: int = 0
+    # agent_address -> run_id of its running/starting run; built on first use, then
+    # kept current by append_run/update_run instead of rescanning every run.
+    active: dict[str, str] | None = None
+    # Every write or replay installs a new index, so this changes whenever runs do.
+    version: int = field(default_factory=itertools.count(1).__next__)
+
+    def active_agents(self) -> dict[str, str]:
+        if self.active is None:
+            active: dict[str, str] = {}
+            for entry in self.by_id.values():
+                agent_address = entry.get("agent_address")
+                if agent_address and entry.get("status") in _ACTIVE_STATUSES:
+                    active.setdefault(agent_address, entry.get("run_id"))
+            self.active = active
+        return self.active
+
+
+_INDEX: _RunIndex | None = None
 
 
 def _runs_path() -> Path:
@@ -17,43 +67,236 @@ def _runs_path() -> Path:
     return _RUN_STORAGE_PATH
 
 
+def _replay_runs(data: bytes) -> tuple[dict[str, dict[str, Any]], int]:
+    """Fold runs log lines into live records; return them with the stale line count."""
+
+    by_id: dict[str, dict[str, Any]] = {}
+    lines = 0
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
+        run_id = record.get("run_id")
+        if not run_id:
+            continue
+        lines += 1
+        if record.pop("op", None) == "update":
+            entry = by_id.get(run_id)
+            if entry is not None:
+                entry.update(record)
+        else:
+            by_id[run_id] = record
+    return by_id, lines - len(by_id)
+
+
+def _cache_index(
+    path: Path,
+    by_id: dict[str, dict[str, Any]],
+    stale_lines: int,
+    active: dict[str, str] | None = None,
+) -> _RunIndex:
+    global _INDEX
+    stat = path.stat()
+    _INDEX = _RunIndex(stat.st_mtime_ns, stat.st_size, by_id, stale_lines, active)
+    return _INDEX
+
+
+def _import_legacy_runs() -> bool:
+    """Convert a pre-JSONL runs.json file into the append-only log."""
+
+    legacy_path = _LEGACY_RUN_STORAGE_PATH
+    if not legacy_path.exists():
+        return False
+    _write_runs(orjson.loads(legacy_path.read_bytes()))
+    legacy_path.replace(legacy_path.with_name("runs.json.bak"))
+    return True
+
+
+def _index() -> _RunIndex | None:
+    """Return the run index, replaying the log only when it changed."""
+
+    global _INDEX
+    with _RUNS_LOCK:
+        try:
+            stat = _RUN_STORAGE_PATH.stat()
+        except FileNotFoundError:
+            _INDEX = None
+            if _import_legacy_runs():
+                return _INDEX
+            return None
+
+        cached = _INDEX
+        if cached is not None and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+            return cached
+
+        data = _RUN_STORAGE_PATH.read_bytes()
+        if data and not data.endswith(b"\n"):
+            # A crash mid-append left a torn last line. Replay skips it, but the next
+            # append must not be glued onto it, so terminate it first.
+            with _RUN_STORAGE_PATH.open("ab") as fh:
+                fh.write(b"\n")
+            stat = _RUN_STORAGE_PATH.stat()
+        by_id, stale_lines = _replay_runs(data)
+        _INDEX = _RunIndex(stat.st_mtime_ns, stat.st_size, by_id, stale_lines)
+        return _INDEX
+
+
+def runs_version() -> int:
+    """Return a number that changes whenever the stored runs do (0 when there are none)."""
+
+    index = _index()
+    return index.version if index is not None else 0
+
+
 def load_runs() -> list[dict[str, Any]]:
-    path = _runs_path()
-    if not path.exists():
-        return []
-    return json.loads(path.read_text(encoding="utf-8"))
+    """Return all stored run records in the order they were started.
+
+    Records are shared with the index and must be treated as read-only.
+    """
+
+    # Copied under the lock: writers may be inserting from another thread.
+    with _RUNS_LOCK:
+        index = _index()
+        return list(index.by_id.values()) if index is not None else []
 
 
 def _write_runs(entries: list[dict[str, Any]]) -> None:
+    """Rewrite the runs log atomically with exactly the provided records."""
+
+    with _RUNS_LOCK:
+        path = _runs_path()
+        tmp_path = path.with_suffix(".jsonl.tmp")
+        tmp_path.write_bytes(b"".join(orjson.dumps(entry) + b"\n" for entry in entries))
+        os.replace(tmp_path, path)
+        _cache_index(path, {entry["run_id"]: entry for entry in entries if entry.get("run_id")}, 0)
+
+
+def _append_run_records(records: list[dict[str, Any]]) -> Path:
     path = _runs_path()
-    path.write_text(json.dumps(entries, indent=2), encoding="utf-8")
+    with path.open("ab") as fh:
+        fh.write(b"".join(orjson.dumps(record) + b"\n" for record in records))
+    return path
+
+
+def _track_active(active: dict[str, str], entry: dict[str, Any]) -> None:
+    """Apply one run's current status to the active-agent mapping."""
+
+    agent_address = entry.get("agent_address")
+    if not agent_address:
+        return
+    run_id = entry.get("run_id")
+    if entry.get("status") in _ACTIVE_STATUSES:
+        active.setdefault(agent_address, run_id)
+    elif active.get(agent_address) == run_id:
+        # The start guard allows one active run per agent, so nothing else to promote.
+        del active[agent_address]
 
 
 def get_run(run_id: str) -> dict[str, Any] | None:
     """Return a single run record by identifier, if present."""
 
-    for entry in load_runs():
-        if entry.get("run_id") == run_id:
-            return entry
-    return None
+    pending = _PENDING_RUNS.get(run_id)
+    if pending is not None:
+        return pending
+    index = _index()
+    return index.by_id.get(run_id) if index is not None else None
+
+
+def get_runs(run_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+    """Return the run records for ``run_ids`` keyed by run id.
+
+    Records are shared with the index and must be treated as read-only.
+    """
+
+    index = _index()
+    runs = index.by_id if index is not None else {}
+    pending = _PENDING_RUNS
+    found: dict[str, dict[str, Any]] = {}
+    for run_id in run_ids:
+        # Staged runs win, as in get_run: their append_run has not landed yet.
+        entry = pending.get(run_id) or runs.get(run_id)
+        if entry is not None:
+            found[run_id] = entry
+    return found
+
+
+def active_agents() -> dict[str, str]:
+    """Return ``{agent_address: run_id}`` for agents assigned to a running or starting run.
+
+    The mapping is shared with the index and must be treated as read-only.
+    """
+
+    index = _index()
+    active = index.active_agents() if index is not None else {}
+    if _PENDING_RUNS:
+        active = dict(active)
+        for entry in list(_PENDING_RUNS.values()):
+            if entry.get("status") in _ACTIVE_STATUSES:
+                active.setdefault(entry.get("agent_address"), entry.get("run_id"))
+    return active
+
+
+def stage_run(entry: dict[str, Any]) -> None:
+    """Make ``entry`` visible to lookups until a matching ``append_run`` persists it."""
+
+    _PENDING_RUNS[entry["run_id"]] = entry
+
+
+def discard_staged_run(run_id: str) -> None:
+    """Forget a staged entry whose ``append_run`` failed."""
+
+    _PENDING_RUNS.pop(run_id, None)
 
 
 def append_run(entry: dict[str, Any]) -> None:
-    runs = load_runs()
-    runs.append(entry)
-    _write_runs(runs)
+    """Append a new run record to the log without rewriting earlier ones."""
+
+    with _RUNS_LOCK:
+        index = _index()
+        by_id = index.by_id if index is not None else {}
+        stale_lines = index.stale_lines if index is not None else 0
+        active = index.active if index is not None else {}
+        path = _append_run_records([entry])
+        by_id[entry["run_id"]] = entry
+        if active is not None:
+            _track_active(active, entry)
+        _cache_index(path, by_id, stale_lines, active)
+    _PENDING_RUNS.pop(entry.get("run_id"), None)
 
 
 def update_run(run_id: str, updates: dict[str, Any]) -> None:
-    entries = load_runs()
-    changed = False
-    for entry in entries:
-        if entry.get("run_id") == run_id:
-            entry.update(updates)
-            changed = True
-            break
-    if changed:
-        _write_runs(entries)
+    pending = _PENDING_RUNS.get(run_id)
+    if pending is not None:
+        # Not written yet: the pending entry is what append_run will persist.
+        pending.update(updates)
+
+    with _RUNS_LOCK:
+        index = _index()
+        entry = index.by_id.get(run_id) if index is not None else None
+        if entry is None:
+            return
+        entry.update(updates)
+        active = index.active
+        if active is not None and "status" in updates:
+            _track_active(active, entry)
+        stale_lines = index.stale_lines + 1
+        if stale_lines > len(index.by_id) * _COMPACT_RATIO:
+            _write_runs(list(index.by_id.values()))
+        else:
+            path = _append_run_records([{"op": "update", "run_id": run_id, **updates}])
+            _cache_index(path, index.by_id, stale_lines, active)
+
+
+def compact_runs() -> None:
+    """Rewrite the runs log with one merged record per run."""
+
+    with _RUNS_LOCK:
+        index = _index()
+        if index is not None and index.stale_lines:
+            _write_runs(list(index.by_id.values()))
 
 
 def runs_path() -> Path:
@@ -2,13 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
 from typing import Any
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from pydantic import ValidationError
 
+from app.common.web import TEMPLATES, wallet_context
 from app.lib.rate_limiter import enforce_rate_limit
 from app.monitoring import MonitoringService
 from app.monitoring.routes import get_monitoring_service
@@ -24,17 +25,6 @@ from app.trading.service import get_start_overview, start_bot_run, stop_bot_run
 router = APIRouter()
 
 
-def _templates(request: Request) -> Jinja2Templates:
-    return request.app.state.templates  # type: ignore[attr-defined]
-
-
-def _wallet_context(request: Request) -> dict[str, Any]:
-    builder = getattr(request.app.state, "wallet_context_builder", None)  # type: ignore[attr-defined]
-    if callable(builder):
-        return builder(request.session)
-    return {"wallet_address": None, "wallet_address_short": None}
-
-
 def _default_form_values() -> dict[str, str]:
     return {
         "market": DEFAULT_MARKETS[0],
@@ -44,7 +34,7 @@ def _default_form_values() -> dict[str, str]:
     }
 
 
-def _base_context(
+async def _base_context(
     request: Request,
     *,
     form_values: dict[str, str],
@@ -52,7 +42,8 @@ def _base_context(
     form_success: str | None,
     stop_target_run_id: str | None,
 ) -> dict[str, Any]:
-    overview = get_start_overview()
+    # The overview may replay the runs log from disk; keep that off the event loop.
+    overview = await asyncio.to_thread(get_start_overview)
     context: dict[str, Any] = {
         "request": request,
         "markets": DEFAULT_MARKETS,
@@ -63,21 +54,21 @@ def _base_context(
         "form_success": form_success,
         "start_overview": overview,
         "stop_target_run_id": stop_target_run_id,
-        **_wallet_context(request),
+        **wallet_context(request.session),
     }
     return context
 
 
 @router.get("/start-panel", response_class=HTMLResponse)
 async def start_panel(request: Request) -> HTMLResponse:
-    context = _base_context(
+    context = await _base_context(
         request,
         form_values=_default_form_values(),
         form_errors={},
         form_success=None,
         stop_target_run_id=None,
     )
-    return _templates(request).TemplateResponse("trading/_start_panel.html", context)
+    return TEMPLATES.TemplateResponse("trading/_start_panel.html", context)
 
 
 @router.post("/start", response_class=HTMLResponse)
@@ -106,7 +97,7 @@ async def start_bot_form(
     payload: BotStartRequest | None = None
     if not form_errors:
         try:
-            payload = BotStartRequest(**raw_values)
+            payload = BotStartRequest.model_validate(raw_values)
         except ValidationError as exc:
             for error in exc.errors():
                 field = error.get("loc", ["_"])[-1]
@@ -133,7 +124,7 @@ async def start_bot_form(
             else:
                 form_errors["__all__"] = exc.detail if isinstance(exc.detail, str) else "Unable to start bot."
 
-    context = _base_context(
+    context = await _base_context(
         request,
         form_values=raw_values,
         form_errors=form_errors,
@@ -142,7 +133,7 @@ async def start_bot_form(
     )
 
     template_name = "trading/start_panel_response.html"
-    return _templates(request).TemplateResponse(template_name, context)
+    return TEMPLATES.TemplateResponse(template_name, context)
 
 
 @router.post("/stop", response_class=HTMLResponse)
@@ -164,7 +155,7 @@ async def stop_bot_form(
         form_errors["run_id"] = "Select a run to stop."
     else:
         try:
-            payload = BotStopRequest(run_id=run_id_raw)
+            payload = BotStopRequest.model_validate({"run_id": run_id_raw})
         except ValidationError as exc:
             for error in exc.errors():
                 message = error.get("msg", "Invalid run identifier")
@@ -183,7 +174,7 @@ async def stop_bot_form(
                 detail = exc.detail if isinstance(exc.detail, str) else "Unable to stop run."
                 form_errors["__all__"] = detail
 
-    context = _base_context(
+    context = await _base_context(
         request,
         form_values=_default_form_values(),
         form_errors=form_errors,
@@ -192,4 +183,4 @@ async def stop_bot_form(
     )
 
     template_name = "trading/start_panel_response.html"
-    return _templates(request).TemplateResponse(template_name, context)
+    return TEMPLATES.TemplateResponse(template_name, context)
@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 
+from app.common.encoding import ok_envelope
 from app.transfers.schemas import InternalTransferRequest
 from app.transfers.service import submit_internal_transfer
 
@@ -12,9 +13,9 @@ router = APIRouter()
 
 
 @router.post("/transfer")
-async def create_internal_transfer(request: Request, payload: InternalTransferRequest) -> JSONResponse:
+async def create_internal_transfer(request: Request, payload: InternalTransferRequest) -> Response:
     """Execute an internal transfer through the Hyperliquid exchange adapter."""
 
     wallet_address: str | None = request.session.get("wallet_address")
     result = await submit_internal_transfer(payload, wallet_address)
-    return JSONResponse({"ok": True, "data": result.model_dump(mode="json")})
+    return Response(content=ok_envelope(result), media_type="application/json")
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import secrets
 from datetime import UTC, datetime
 from typing import Any
 
@@ -10,11 +9,15 @@ from fastapi import HTTPException
 
 from app.authz import storage as auth_storage
 from app.config import get_settings
-from app.lib.hyperliquid_adapter import ExchangeCredentials, HyperliquidExchangeClient
+from app.lib.hyperliquid_adapter import ExchangeCredentials, HyperliquidExchangeClient, get_client
+from app.lib.ids import next_id
 from app.trading import storage as trading_storage
 from app.transfers.schemas import InternalTransferRequest, InternalTransferResponse
 
 
+settings = get_settings()
+
+
 async def submit_internal_transfer(
     payload: InternalTransferRequest,
     wallet_address: str | None,
@@ -32,31 +35,26 @@ async def submit_internal_transfer(
     if not isinstance(agent_address, str):
         raise HTTPException(status_code=500, detail="Run entry missing agent wallet")
 
-    agents = auth_storage.load_agents()
-    agent_entry = next((entry for entry in agents if entry.get("agent_address") == agent_address), None)
+    agent_entry = auth_storage.get_agent(agent_address)
     if not agent_entry:
         raise HTTPException(status_code=400, detail="Agent wallet unavailable")
 
     private_key = _decrypt_private_key(agent_entry)
 
-    settings = get_settings()
-    client = HyperliquidExchangeClient(
+    client: HyperliquidExchangeClient = await get_client(
         ExchangeCredentials(agent_address, private_key),
-        base_url=settings.hl_rest_base,
+        settings.hl_rest_base,
     )
 
     amount = float(payload.amount)
     response_data: dict[str, Any]
-    try:
-        if payload.kind == "usdSend":
-            response_data = await client.usd_send(payload.destination, amount)
-        else:
-            asset = payload.asset or ""
-            response_data = await client.spot_send(asset, payload.destination, amount)
-    finally:
-        await client.close()
-
-    transfer_id = secrets.token_hex(16)
+    if payload.kind == "usdSend":
+        response_data = await client.usd_send(payload.destination, amount)
+    else:
+        asset = payload.asset or ""
+        response_data = await client.spot_send(asset, payload.destination, amount)
+
+    transfer_id = next_id()
     submitted_at = datetime.now(tz=UTC)
     result = InternalTransferResponse(
         kind=payload.kind,
@@ -88,8 +86,7 @@ def _decrypt_private_key(agent_entry: dict[str, Any]) -> str:
     cipher = agent_entry.get("key_cipher")
     if not cipher:
         raise HTTPException(status_code=400, detail="Agent entry missing key cipher")
-    fernet = auth_storage.get_fernet()
     try:
-        return fernet.decrypt(cipher.encode("utf-8")).decode("utf-8")
+        return auth_storage.decrypt_agent_key(cipher)
     except Exception as exc:  # pragma: no cover - defensive
         raise HTTPException(status_code=500, detail="Unable to decrypt agent key") from exc
@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 
+from app.common.encoding import ok_envelope
 from app.withdraw.schemas import WithdrawPrepareRequest
 from app.withdraw.service import prepare_withdrawal
 
@@ -12,7 +13,7 @@ router = APIRouter()
 
 
 @router.post("/prepare")
-async def prepare_withdraw_endpoint(request: Request, payload: WithdrawPrepareRequest) -> JSONResponse:
+async def prepare_withdraw_endpoint(request: Request, payload: WithdrawPrepareRequest) -> Response:
     wallet_address: str | None = request.session.get("wallet_address")
     instructions = await prepare_withdrawal(payload, wallet_address)
-    return JSONResponse({"ok": True, "data": instructions.model_dump(mode="json")})
+    return Response(content=ok_envelope(instructions), media_type="application/json")
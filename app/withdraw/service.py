@@ -2,13 +2,14 @@
 
 from __future__ import annotations
 
-import secrets
 from datetime import UTC, datetime
+from functools import lru_cache
 from typing import Any
 
 from fastapi import HTTPException
 
 from app.authz import storage as auth_storage
+from app.lib.ids import next_nonce_and_id
 from app.trading import storage as trading_storage
 from app.withdraw.schemas import WithdrawInstructions, WithdrawPrepareRequest
 
@@ -16,6 +17,7 @@ CHAIN_IDS = {
     "arbitrum": 42161,
     "ethereum": 1,
 }
+_CHAIN_DISPLAY = {chain: chain.capitalize() for chain in CHAIN_IDS}
 
 
 async def prepare_withdrawal(
@@ -26,14 +28,16 @@ async def prepare_withdrawal(
     if not run_entry:
         raise HTTPException(status_code=404, detail="Run not found")
 
-    if wallet_address and wallet_address.lower() != run_entry.get("wallet_address"):
+    # Session wallet addresses are lowercased when stored (WalletSessionPayload), and
+    # runs record that same session value.
+    if wallet_address and wallet_address != run_entry.get("wallet_address"):
         raise HTTPException(status_code=403, detail="Wallet mismatch for run")
 
     agent_address = run_entry.get("agent_address")
     if not isinstance(agent_address, str):
         raise HTTPException(status_code=500, detail="Agent wallet unavailable")
 
-    nonce = secrets.randbits(64)
+    nonce, transfer_id = next_nonce_and_id()
 
     typed_data = _build_typed_data(
         chain=payload.chain,
@@ -44,10 +48,10 @@ async def prepare_withdrawal(
     )
 
     message = typed_data["message"]
-    transfer_id = secrets.token_hex(16)
     submitted_at = datetime.now(tz=UTC)
 
-    instructions = WithdrawInstructions(
+    # Every field was built or validated above, so skip re-validating them.
+    instructions = WithdrawInstructions.model_construct(
         typed_data=typed_data,
         message=message,
         human_readable=_build_human_readable(payload, agent_address),
@@ -63,7 +67,13 @@ async def prepare_withdrawal(
         "action": "withdraw_prepare",
         "run_id": payload.run_id,
         "agent_address": agent_address,
-        "payload": payload.model_dump(mode="json"),
+        # Same shape as payload.model_dump(mode="json"), without the serializer pass.
+        "payload": {
+            "run_id": payload.run_id,
+            "amount_usd": str(payload.amount_usd),
+            "l1_destination": payload.l1_destination,
+            "chain": payload.chain,
+        },
         "typed_data": typed_data,
     }
     auth_storage.append_audit(audit_entry)
@@ -71,33 +81,43 @@ async def prepare_withdrawal(
     return instructions
 
 
+# EIP-712 type definitions are identical for every withdrawal; they are shared by all
+# payloads and only ever serialized, never mutated.
+_TYPED_DATA_TYPES: dict[str, Any] = {
+    "EIP712Domain": [
+        {"name": "name", "type": "string"},
+        {"name": "version", "type": "string"},
+        {"name": "chainId", "type": "uint256"},
+        {"name": "verifyingContract", "type": "address"},
+    ],
+    "HLWithdraw": [
+        {"name": "destination", "type": "address"},
+        {"name": "amount", "type": "string"},
+        {"name": "nonce", "type": "uint64"},
+    ],
+}
+
+
+@lru_cache(maxsize=64)
+def _typed_data_domain(chain: str, agent_address: str) -> dict[str, Any]:
+    # A process usually serves a handful of agents, so the domain is shared per
+    # (chain, agent) like the types above; it is only read and serialized.
+    return {
+        "name": "Hyperliquid",
+        "version": "1",
+        "chainId": CHAIN_IDS.get(chain, 42161),
+        "verifyingContract": agent_address,
+    }
+
+
 def _build_typed_data(*, chain: str, destination: str, amount: Any, agent_address: str, nonce: int) -> dict[str, Any]:
-    chain_id = CHAIN_IDS.get(chain, 42161)
-    amount_str = str(amount)
     return {
-        "types": {
-            "EIP712Domain": [
-                {"name": "name", "type": "string"},
-                {"name": "version", "type": "string"},
-                {"name": "chainId", "type": "uint256"},
-                {"name": "verifyingContract", "type": "address"},
-            ],
-            "HLWithdraw": [
-                {"name": "destination", "type": "address"},
-                {"name": "amount", "type": "string"},
-                {"name": "nonce", "type": "uint64"},
-            ],
-        },
+        "types": _TYPED_DATA_TYPES,
         "primaryType": "HLWithdraw",
-        "domain": {
-            "name": "Hyperliquid",
-            "version": "1",
-            "chainId": chain_id,
-            "verifyingContract": agent_address,
-        },
+        "domain": _typed_data_domain(chain, agent_address),
         "message": {
             "destination": destination,
-            "amount": amount_str,
+            "amount": str(amount),
             "nonce": nonce,
         },
     }
@@ -106,5 +126,5 @@ def _build_typed_data(*, chain: str, destination: str, amount: Any, agent_addres
 def _build_human_readable(payload: WithdrawPrepareRequest, agent_address: str) -> str:
     return (
         f"Withdraw {payload.amount_usd} USD from agent {agent_address} to "
-        f"{payload.l1_destination} on {payload.chain.capitalize()}"
+        f"{payload.l1_destination} on {_CHAIN_DISPLAY[payload.chain]}"
     )
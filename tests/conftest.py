@@ -1,23 +1,36 @@
 """Pytest fixtures for Hyperliquid bot tests."""
 
-from collections.abc import AsyncIterator
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from datetime import UTC, datetime
 import os
 from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock
 
 import pytest
 import pytest_asyncio
 from fastapi import FastAPI
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 
 os.environ.setdefault("SECRET_KEY_SALT", "test-secret-key")
 os.environ.setdefault("HL_ENV", "dev")
 os.environ.setdefault("WALLETCONNECT_PROJECT_ID", "test-project-id")
 
-_STORAGE_PATH = Path(__file__).resolve().parent / "__storage"
-os.environ.setdefault("STORAGE_DIR", str(_STORAGE_PATH))
+# Each pytest-xdist worker gets its own directory, so the agent registry, run index and
+# audit log are never shared between processes running tests in parallel.
+_STORAGE_PATH = Path(__file__).resolve().parent / "__storage" / os.environ.get("PYTEST_XDIST_WORKER", "main")
+# Assigned, not defaulted: a STORAGE_DIR from the shell would point the app somewhere
+# other than the directory the fixtures below clear.
+os.environ["STORAGE_DIR"] = str(_STORAGE_PATH)
 _STORAGE_PATH.mkdir(parents=True, exist_ok=True)
 
+from app.authz import storage as auth_storage
+from app.lib import hyperliquid_adapter
 from app.main import app as fastapi_app
+from app.trading import service as trading_service
+from app.trading import storage as trading_storage
+from app.transfers import service as transfers_service
 
 
 @pytest.fixture(scope="session")
@@ -26,24 +39,120 @@ def app() -> FastAPI:
     return fastapi_app
 
 
+@pytest.fixture(scope="session")
+def event_loop() -> Iterator[asyncio.AbstractEventLoop]:
+    """Run the whole suite on one loop so the HTTP client can be session-scoped."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def _session_client(app: FastAPI) -> AsyncIterator[AsyncClient]:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        yield client
+
+
 @pytest_asyncio.fixture()
-async def async_client(app: FastAPI) -> AsyncIterator[AsyncClient]:
+async def async_client(_session_client: AsyncClient) -> AsyncIterator[AsyncClient]:
     """Provide an `httpx.AsyncClient` configured for the FastAPI app."""
-    async with AsyncClient(app=app, base_url="http://testserver") as client:
-        yield client
+    # The client is shared across tests; a fresh cookie jar keeps wallet sessions apart.
+    _session_client.cookies.clear()
+    yield _session_client
+
+
+@pytest.fixture()
+def register_agent(async_client: AsyncClient) -> Callable[..., Awaitable[None]]:
+    """Return a coroutine that connects ``wallet`` and registers an agent for it."""
+
+    async def _register(wallet: str, agent_address: str, private_key: str, label: str = "Primary") -> None:
+        await async_client.post("/authz/session", json={"address": wallet})
+        response = await async_client.post(
+            "/authz/agent",
+            json={
+                "label": label,
+                "agent_address": agent_address,
+                "private_key": private_key,
+            },
+        )
+        assert response.status_code == 200
+
+    return _register
+
+
+@pytest.fixture()
+def seed_run() -> Callable[..., dict[str, Any]]:
+    """Return a helper that stores a running run record directly, bypassing the API."""
+
+    def _seed(run_id: str, wallet: str, agent_address: str, **overrides: Any) -> dict[str, Any]:
+        entry = {
+            "run_id": run_id,
+            "market": "ETH-PERP",
+            "usd_notional": "100",
+            "leverage": 3,
+            "wallet_address": wallet,
+            "agent_address": agent_address,
+            "status": "running",
+            "started_at": datetime.now(tz=UTC).isoformat(),
+            "duration_minutes": 30,
+            **overrides,
+        }
+        trading_storage.append_run(entry)
+        return entry
+
+    return _seed
+
+
+@pytest.fixture()
+def get_client_spy(monkeypatch: pytest.MonkeyPatch) -> AsyncMock:
+    """Wrap the services' ``get_client`` so tests can see which credentials were used."""
+
+    spy = AsyncMock(side_effect=hyperliquid_adapter.get_client)
+    monkeypatch.setattr(trading_service, "get_client", spy)
+    monkeypatch.setattr(transfers_service, "get_client", spy)
+    return spy
+
+
+@pytest.fixture()
+def buffered_audit(monkeypatch: pytest.MonkeyPatch) -> list[dict[str, Any]]:
+    """Collect audit records in memory instead of writing them to the log."""
+
+    buffer: list[dict[str, Any]] = []
+    monkeypatch.setattr(auth_storage, "_write_audit_batch", buffer.extend)
+    return buffer
+
+
+@pytest.fixture()
+def audit_tail(buffered_audit: list[dict[str, Any]]) -> Callable[..., list[dict[str, Any]]]:
+    """Return a reader for the audit records written during the test.
+
+    Records are the dicts handed to ``append_audit``; nothing is serialized or read
+    back. Pass ``run_id=`` to keep only that run's records.
+    """
+
+    def _tail(run_id: str | None = None) -> list[dict[str, Any]]:
+        if run_id is None:
+            return list(buffered_audit)
+        return [entry for entry in buffered_audit if entry.get("run_id") == run_id]
+
+    return _tail
+
+
+def _clear_storage() -> None:
+    # DirEntry.is_file() uses the type readdir already returned, so no stat per file.
+    with os.scandir(_STORAGE_PATH) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                os.unlink(entry.path)
 
 
 @pytest.fixture(autouse=True)
 def clean_storage() -> AsyncIterator[None]:
     """Ensure the storage directory is empty before and after each test."""
 
-    for child in _STORAGE_PATH.glob("*"):
-        if child.is_file():
-            child.unlink()
+    _clear_storage()
     yield
-    for child in _STORAGE_PATH.glob("*"):
-        if child.is_file():
-            child.unlink()
+    _clear_storage()
 
 
 @pytest.fixture(autouse=True)
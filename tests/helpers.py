@@ -0,0 +1,16 @@
+"""Shared request helpers for the test suite."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from httpx import AsyncClient, Response
+
+_JSON_HEADERS = {"content-type": "application/json"}
+
+
+async def jpost(client: AsyncClient, url: str, data: Any) -> Response:
+    """POST ``data`` as an orjson-encoded JSON body."""
+
+    return await client.post(url, content=orjson.dumps(data), headers=_JSON_HEADERS)
@@ -2,14 +2,18 @@
 
 import asyncio
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 
 import pytest
 from httpx import AsyncClient
 
-from app.deposit.routes import _extract_usd_balance
+from app.authz import storage as auth_storage
+from app.deposit.routes import _extract_usd_balance, _format_usd
 from app.lib.info_client import InfoClientError
 from app.trading import storage as trading_storage
+from tests.helpers import jpost
 
 
 @pytest.mark.asyncio
@@ -64,6 +68,19 @@ async def test_wallet_session_rejects_invalid_address(async_client: AsyncClient)
     assert response.status_code == 422
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "address",
+    ["0x0x" + "a" * 38, "0x" + "\uff10" * 40, "0x" + "a" * 39 + "_"],
+    ids=["double-prefix", "full-width-digits", "underscore"],
+)
+async def test_wallet_session_rejects_malformed_hex(async_client: AsyncClient, address: str) -> None:
+    """Addresses whose 40 characters are not all ASCII hex digits are rejected."""
+    response = await jpost(async_client, "/authz/session", {"address": address})
+
+    assert response.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_agent_registration_encrypts_and_logs(async_client: AsyncClient, storage_dir) -> None:
     """Agent registration endpoint should store encrypted key and log audit metadata."""
@@ -81,9 +98,9 @@ async def test_agent_registration_encrypts_and_logs(async_client: AsyncClient, s
     assert body["data"]["agent_address"] == payload["agent_address"].lower()
     assert "stored_at" in body["data"]
 
-    registry_path = storage_dir / "agents.json"
+    registry_path = storage_dir / "agents.jsonl"
     assert registry_path.exists()
-    registry = json.loads(registry_path.read_text(encoding="utf-8"))
+    registry = [json.loads(line) for line in registry_path.read_text(encoding="utf-8").splitlines() if line]
     assert registry[0]["agent_address"] == payload["agent_address"].lower()
     assert registry[0]["label"] == payload["label"]
     assert registry[0]["key_cipher"].startswith("gAAAA")  # Fernet token prefix
@@ -96,6 +113,77 @@ async def test_agent_registration_encrypts_and_logs(async_client: AsyncClient, s
     assert lines[0]["agent_address"] == payload["agent_address"].lower()
 
 
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/authz/agent/delete", "/authz/agent/select"])
+async def test_agent_form_routes_check_wallet_before_address(async_client: AsyncClient, path: str) -> None:
+    response = await async_client.post(path, data={"agent_address": "not-an-address"})
+    assert response.status_code == 400
+
+    await jpost(async_client, "/authz/session", {"address": "0x" + "a1" * 20})
+    response = await async_client.post(path, data={"agent_address": "not-an-address"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["agent_address"]
+    response = await async_client.post(path, data={})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_agent_registration_form_reports_missing_fields(async_client: AsyncClient) -> None:
+    await jpost(async_client, "/authz/session", {"address": "0x" + "a1" * 20})
+    response = await async_client.post("/authz/agent", data={"label": "Primary"})
+
+    assert response.status_code == 200
+    assert "HX-Trigger" not in response.headers
+    assert "Agent address must be 0x-prefixed" in response.text
+    assert auth_storage.load_agents() == []
+
+
+@pytest.mark.asyncio
+async def test_agent_registration_json_rejects_bad_address(async_client: AsyncClient) -> None:
+    payload = {"label": "Primary", "agent_address": "0x1234", "private_key": "0x" + "1234" * 16}
+    response = await jpost(async_client, "/authz/agent", payload)
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["agent_address"]
+
+def test_concurrent_agent_registrations_store_one_record() -> None:
+    """Racing registrations of one agent address store it exactly once."""
+
+    agent_address = "0x" + "abcd" * 10
+    barrier = threading.Barrier(8)
+
+    def _register(index: int) -> bool:
+        barrier.wait()
+        return auth_storage.register_agent(
+            {"agent_address": agent_address, "label": f"Racer {index}", "owner_wallet": f"0x{index:040x}"}
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(_register, range(8)))
+
+    assert results.count(True) == 1
+    assert len(auth_storage.load_agents()) == 1
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("2.675", "2.68"),
+        ("2.665", "2.66"),
+        ("0.005", "0.00"),
+        ("1234567.891", "1,234,567.89"),
+        ("-2.675", "-2.68"),
+        ("-1234.5", "-1,234.50"),
+    ],
+)
+def test_format_usd_rounds_half_cents_like_decimal_quantize(value: str, expected: str) -> None:
+    """Balances are rounded from the Decimal itself, exactly as quantize formatting did."""
+
+    assert _format_usd(Decimal(value)) == expected
+    assert expected == f"{Decimal(value).quantize(Decimal('0.01')):,.2f}"
+
+
 @pytest.mark.asyncio
 async def test_extract_usd_balance_handles_various_shapes() -> None:
     """Balance extraction should support minimal payload shapes."""
@@ -167,7 +255,9 @@ async def test_balance_partial_renders_error_when_unavailable(monkeypatch, async
 
 
 @pytest.mark.asyncio
-async def test_start_bot_endpoint_persists_run(monkeypatch, async_client: AsyncClient, storage_dir) -> None:
+async def test_start_bot_endpoint_persists_run(
+    monkeypatch, async_client: AsyncClient, storage_dir, get_client_spy
+) -> None:
     """POST /api/bot/start should trigger exchange calls and persist run metadata."""
 
     wallet_address = "0x" + "f00d" * 10
@@ -190,7 +280,9 @@ async def test_start_bot_endpoint_persists_run(monkeypatch, async_client: AsyncC
     async def fake_set(self, market: str, leverage: int):
         calls["set_leverage"] = (market, leverage)
 
-    async def fake_order(self, market: str, notional: float):
+    async def fake_order(self, market: str, notional: float, *, after=None):
+        if after is not None:
+            await after
         calls["market_order"] = (market, notional)
 
     async def fake_close(self):
@@ -228,8 +320,8 @@ async def test_start_bot_endpoint_persists_run(monkeypatch, async_client: AsyncC
     # Background tasks execute after response; yield control to allow completion
     await asyncio.sleep(0)
 
-    runs_json = trading_storage.runs_path().read_text(encoding="utf-8")
-    runs = json.loads(runs_json)
+    assert trading_storage.runs_path().exists()
+    runs = trading_storage.load_runs()
     assert runs
     latest = runs[-1]
     assert latest["run_id"] == data["run_id"]
@@ -239,7 +331,9 @@ async def test_start_bot_endpoint_persists_run(monkeypatch, async_client: AsyncC
 
     assert calls["set_leverage"] == ("BTC-PERP", 3)
     assert calls["market_order"] == ("BTC-PERP", 250.5)
-    assert calls["close"] is True
+    assert {call.args[0].address for call in get_client_spy.await_args_list} == {agent_address}
+    # The exchange client is shared across requests rather than closed after each one.
+    assert "close" not in calls
 
 
 @pytest.mark.asyncio
@@ -272,7 +366,7 @@ async def test_start_bot_requires_wallet(async_client: AsyncClient) -> None:
 
 
 @pytest.mark.asyncio
-async def test_stop_bot_closes_run(monkeypatch, async_client: AsyncClient, app) -> None:
+async def test_stop_bot_closes_run(monkeypatch, async_client: AsyncClient, app, get_client_spy) -> None:
     """Stop endpoint should cancel orders, close position, and update run state."""
 
     hub = app.state.monitoring_hub
@@ -298,7 +392,9 @@ async def test_stop_bot_closes_run(monkeypatch, async_client: AsyncClient, app)
     async def fake_set(self, market: str, leverage: int):  # type: ignore[unused-argument]
         return None
 
-    async def fake_order(self, market: str, notional: float):
+    async def fake_order(self, market: str, notional: float, *, after=None):
+        if after is not None:
+            await after
         return None
 
     async def fake_cancel(self, market: str):
@@ -355,8 +451,8 @@ async def test_stop_bot_closes_run(monkeypatch, async_client: AsyncClient, app)
     assert stop_data["run_id"] == run_id
     assert "closed_at" in stop_data
 
-    runs_json = trading_storage.runs_path().read_text(encoding="utf-8")
-    runs = json.loads(runs_json)
+    assert trading_storage.runs_path().exists()
+    runs = trading_storage.load_runs()
     latest = next(entry for entry in runs if entry["run_id"] == run_id)
     assert latest["status"] == "closed"
     assert "closed_at" in latest
@@ -368,4 +464,6 @@ async def test_stop_bot_closes_run(monkeypatch, async_client: AsyncClient, app)
 
     assert calls["cancel_open_orders"] == ("ETH-PERP",)
     assert calls["close_position"] == ("ETH-PERP",)
-    assert calls["close"] is True
+    assert {call.args[0].address for call in get_client_spy.await_args_list} == {agent_address}
+    # The exchange client is shared across requests rather than closed after each one.
+    assert "close" not in calls
@@ -104,3 +104,77 @@ async def test_history_page_renders(async_client: AsyncClient) -> None:
     response = await async_client.get("/history/")
     assert response.status_code == 200
     assert "History & Audit Trail" in response.text
+
+
+@pytest.mark.asyncio
+async def test_history_api_cursor_pagination(async_client: AsyncClient) -> None:
+    base = datetime.now(tz=UTC) - timedelta(minutes=10)
+    for index in range(5):
+        _append_audit(
+            {
+                "id": f"evt{index}",
+                "ts": (base + timedelta(minutes=index)).timestamp(),
+                "action": "bot_started",
+            }
+        )
+
+    first = (await async_client.get("/history/api", params={"limit": 2})).json()["data"]
+    assert [item["id"] for item in first["items"]] == ["evt4", "evt3"]
+    cursor = first["next_cursor"]
+    assert cursor == {"before_ts": first["items"][-1]["ts"], "before_id": "evt3"}
+
+    second = (await async_client.get("/history/api", params={"limit": 2, **cursor})).json()["data"]
+    assert [item["id"] for item in second["items"]] == ["evt2", "evt1"]
+    assert second["total"] is None
+
+    last = (
+        await async_client.get("/history/api", params={"limit": 2, **second["next_cursor"]})
+    ).json()["data"]
+    assert [item["id"] for item in last["items"]] == ["evt0"]
+    assert last["next_cursor"] is None
+
+    page = await async_client.get("/history/", params={"limit": 2, **cursor})
+    assert page.status_code == 200
+    assert "Older" in page.text
+
+
+@pytest.mark.asyncio
+async def test_history_index_tracks_appended_entries(async_client: AsyncClient, storage_dir) -> None:
+    now = datetime.now(tz=UTC)
+    _append_audit({"id": "evt-old", "ts": (now - timedelta(minutes=2)).timestamp(), "action": "bot_started"})
+
+    first = (await async_client.get("/history/api")).json()["data"]
+    assert [item["id"] for item in first["items"]] == ["evt-old"]
+    assert (storage_dir / "audit_log.idx").exists()
+
+    _append_audit({"id": "evt-new", "ts": now.timestamp(), "action": "bot_stopped", "run_id": "runC"})
+
+    second = (await async_client.get("/history/api")).json()["data"]
+    assert second["total"] == 2
+    assert [item["id"] for item in second["items"]] == ["evt-new", "evt-old"]
+    filtered = (await async_client.get("/history/api", params={"run_id": "runC"})).json()["data"]
+    assert [item["id"] for item in filtered["items"]] == ["evt-new"]
+
+
+@pytest.mark.asyncio
+async def test_history_offset_and_cursor_pages_agree_on_ties_and_late_entries(async_client: AsyncClient) -> None:
+    base = (datetime.now(tz=UTC) - timedelta(minutes=10)).timestamp()
+    # Written out of timestamp order, with three entries sharing one timestamp.
+    for entry_id, minutes in [("evt-d", 3), ("evt-a", 1), ("evt-c", 2), ("evt-e", 2), ("evt-b", 2), ("evt-f", 4)]:
+        _append_audit({"id": entry_id, "ts": base + minutes * 60, "action": "bot_started"})
+    expected = ["evt-f", "evt-d", "evt-e", "evt-c", "evt-b", "evt-a"]
+
+    by_offset = []
+    for offset in range(0, 6, 2):
+        page = (await async_client.get("/history/api", params={"offset": offset, "limit": 2})).json()["data"]
+        by_offset += [item["id"] for item in page["items"]]
+    assert by_offset == expected
+
+    by_cursor, params = [], {"limit": 2}
+    while True:
+        page = (await async_client.get("/history/api", params=params)).json()["data"]
+        by_cursor += [item["id"] for item in page["items"]]
+        if page["next_cursor"] is None:
+            break
+        params = {"limit": 2, **page["next_cursor"]}
+    assert by_cursor == expected
@@ -4,13 +4,25 @@ from __future__ import annotations
 
 import asyncio
 import secrets
+import uuid
 from datetime import UTC, datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock
 
+import anyio
 import pytest
 from httpx import AsyncClient
 
+from app.lib.hyperliquid_adapter import HyperliquidAPIError
+from app.lib.metrics import METRICS
+from app.monitoring import service as monitoring_service
+from app.monitoring.hub import _SUBSCRIBER_QUEUE_SIZE, MonitoringHub, _Subscriber
 from app.monitoring.schemas import BotPnLSnapshot
+from app.monitoring.service import MonitoringService
 from app.monitoring.routes import stream_all
+from app.trading import service as trading_service
+from app.trading import storage as trading_storage
+from app.trading.schemas import BotRunRecord
 
 
 @pytest.mark.asyncio
@@ -37,14 +49,17 @@ async def test_monitoring_sse_emits_events(app) -> None:
     try:
         response = await stream_all(hub)  # type: ignore[arg-type]
         body_iter = response.body_iterator
-        chunk = await asyncio.wait_for(body_iter.__anext__(), timeout=1.0)
+        with anyio.fail_after(1.0):
+            chunk = await body_iter.__anext__()
     finally:
         hub.listen = original_listen  # type: ignore[assignment]
 
     payload = chunk.decode("utf-8")
     assert "data:" in payload
-    assert f'"ok": true' in payload.lower()
+    assert '"ok":true' in payload.lower()
     assert run_id in payload
+    # Each chunk must end on an event boundary, or the client sees a partial frame.
+    assert payload.endswith("\n\n")
 
 
 @pytest.mark.asyncio
@@ -78,3 +93,214 @@ async def test_monitoring_table_partial_renders_snapshot(app, async_client: Asyn
     assert "ETH-PERP" in html
     assert "123.45" in html
     assert "1.23" in html
+
+
+class _FakeMonitorClient:
+    """Exchange client stand-in whose first ``close_failures`` closes are rejected."""
+
+    def __init__(self, close_failures: int = 0) -> None:
+        self.close_failures = close_failures
+        self.close_attempts = 0
+
+    async def get_perp_position(self, market: str) -> None:
+        return None
+
+    async def cancel_and_close(self, market: str) -> tuple[dict, dict]:
+        self.close_attempts += 1
+        if self.close_attempts <= self.close_failures:
+            raise HyperliquidAPIError("market_close", {"errors": ["rejected"]})
+        return {}, {}
+
+
+class _RecordingMonitoring:
+    def __init__(self) -> None:
+        self.statuses: list[str] = []
+
+    async def update_snapshot(self, run_id: str, **fields) -> None:
+        return None
+
+    async def mark_status(self, run_id: str, status: str) -> None:
+        self.statuses.append(status)
+
+
+def _start_monitor(run_id: str, monitoring: _RecordingMonitoring, stop_event: asyncio.Event) -> asyncio.Task:
+    return asyncio.create_task(
+        trading_service._monitor_run(
+            run_id=run_id,
+            market="ETH-PERP",
+            duration_minutes=0.01 / 60,
+            credentials=None,  # type: ignore[arg-type]
+            base_url="",
+            monitoring=monitoring,  # type: ignore[arg-type]
+            stop_event=stop_event,
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_monitor_auto_closes_run_at_deadline(monkeypatch, seed_run) -> None:
+    client = _FakeMonitorClient()
+    monkeypatch.setattr(trading_service, "get_client", AsyncMock(return_value=client))
+    run_id = "run" + uuid.uuid4().hex[:12]
+    seed_run(run_id, "0x" + "feed" * 10, "0x" + "beef" * 10)
+    monitoring = _RecordingMonitoring()
+
+    with anyio.fail_after(1.0):
+        await _start_monitor(run_id, monitoring, asyncio.Event())
+
+    assert client.close_attempts == 1
+    assert monitoring.statuses == ["closed"]
+    entry = trading_storage.get_run(run_id)
+    assert entry["status"] == "closed"
+    assert entry["auto_closed"] is True
+
+
+@pytest.mark.asyncio
+async def test_monitor_stop_during_close_retry_hands_over_to_stop(monkeypatch, seed_run) -> None:
+    # A long poll interval: only the stop itself can end the retry wait in time.
+    monkeypatch.setattr(trading_service, "_MONITOR_POLL_SECONDS", 30.0)
+    client = _FakeMonitorClient(close_failures=100)
+    monkeypatch.setattr(trading_service, "get_client", AsyncMock(return_value=client))
+    run_id = "run" + uuid.uuid4().hex[:12]
+    seed_run(run_id, "0x" + "feed" * 10, "0x" + "beef" * 10)
+    monitoring = _RecordingMonitoring()
+    stop_event = asyncio.Event()
+
+    task = _start_monitor(run_id, monitoring, stop_event)
+    with anyio.fail_after(1.0):
+        while client.close_attempts == 0:
+            await asyncio.sleep(0.001)
+        stop_event.set()
+        await task
+
+    assert client.close_attempts == 1
+    assert monitoring.statuses == []
+    assert trading_storage.get_run(run_id)["status"] == "running"
+
+
+def test_monitor_semaphore_is_bound_to_the_running_loop() -> None:
+    async def current() -> asyncio.Semaphore:
+        return trading_service._monitor_semaphore()
+
+    async def twice() -> tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        return await current(), await current()
+
+    first, again = asyncio.run(twice())
+    assert first is again
+    # A later loop gets its own semaphore instead of one tied to a closed loop.
+    assert asyncio.run(current()) is not first
+
+
+@pytest.mark.asyncio
+async def test_shed_tick_is_requeued_without_overwriting_newer_values() -> None:
+    service = MonitoringService(MonitoringHub())
+    service.queue_coin_update("btc", mark_price="101")
+
+    async with service._lock:
+        # The flusher has already taken this tick out of the queue when it is shed.
+        shed = await service.update_by_coin("btc", mark_price="100", entry_price="90")
+
+    assert shed == []
+    assert service._pending_ticks == {"BTC": {"mark_price": "101", "entry_price": "90"}}
+
+
+class _CountingHub(MonitoringHub):
+    def __init__(self) -> None:
+        super().__init__()
+        self.published: list[BotPnLSnapshot] = []
+
+    async def publish(self, snapshot: BotPnLSnapshot) -> None:
+        self.published.append(snapshot)
+        await super().publish(snapshot)
+
+
+def _run_record(run_id: str, market: str = "BTC-PERP") -> BotRunRecord:
+    return BotRunRecord(
+        run_id=run_id,
+        market=market,
+        usd_notional=Decimal("100"),
+        leverage=2,
+        wallet_address="0x" + "feed" * 10,
+        agent_address="0x" + "beef" * 10,
+        status="running",
+        started_at=datetime.now(tz=UTC),
+        duration_minutes=5,
+    )
+
+
+@pytest.mark.asyncio
+async def test_tick_flusher_publishes_each_run_once_per_flush() -> None:
+    hub = _CountingHub()
+    service = MonitoringService(hub)
+    for run_id, market in (("runA", "BTC-PERP"), ("runB", "BTC-PERP"), ("runC", "ETH-PERP")):
+        await service.register_run(_run_record(run_id, market))
+    hub.published.clear()
+
+    for price in ("100", "101", "102"):
+        service.queue_coin_update("btc", mark_price=price)
+    flusher = asyncio.create_task(service.run_tick_flusher(interval=0.001))
+    with anyio.fail_after(1.0):
+        while len(hub.published) < 2:
+            await asyncio.sleep(0.001)
+    # Later flushes find nothing queued and publish nothing.
+    await asyncio.sleep(0.01)
+    flusher.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flusher
+
+    assert sorted(snapshot.run_id for snapshot in hub.published) == ["runA", "runB"]
+    assert {snapshot.mark_price for snapshot in hub.published} == {Decimal("102")}
+    assert service._pending_ticks == {}
+
+
+def test_queue_coin_update_drops_oldest_coin_when_full(monkeypatch) -> None:
+    monkeypatch.setattr(monitoring_service, "_PENDING_COINS_MAX", 2)
+    service = MonitoringService(MonitoringHub())
+    dropped_before = METRICS.snapshot().get("monitoring.tick.dropped", 0)
+
+    service.queue_coin_update("btc", mark_price="1")
+    service.queue_coin_update("eth", mark_price="2")
+    service.queue_coin_update("btc", mark_price="3")  # merges into a waiting coin
+    service.queue_coin_update("sol", mark_price="4")
+
+    assert list(service._pending_ticks) == ["BTC", "SOL"]
+    assert service._pending_ticks["BTC"] == {"mark_price": "3"}
+    assert METRICS.snapshot().get("monitoring.tick.dropped", 0) == dropped_before + 1
+
+
+@pytest.mark.asyncio
+async def test_snapshot_amounts_keep_full_precision() -> None:
+    service = MonitoringService(MonitoringHub())
+    await service.register_run(_run_record("runP"))
+
+    snapshot = await service.update_snapshot(
+        "runP",
+        mark_price=0.1,
+        entry_price=Decimal("2501.123456789123"),
+        unrealized_pnl=Decimal("0.000000001"),
+        realized_pnl=1e-9,
+        position_notional=3,
+    )
+
+    assert snapshot.mark_price == Decimal("0.1")
+    assert snapshot.entry_price == Decimal("2501.123456789123")
+    assert snapshot.unrealized_pnl == Decimal("1E-9")
+    assert snapshot.realized_pnl == Decimal("1E-9")
+    assert snapshot.position_notional == Decimal(3)
+    assert snapshot.total_pnl == Decimal("2E-9")
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_keeps_newest_snapshots() -> None:
+    subscriber = _Subscriber(asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE_SIZE), None)
+    snapshots = [
+        BotPnLSnapshot(run_id=f"run{index}", market="BTC-PERP", status="running")
+        for index in range(_SUBSCRIBER_QUEUE_SIZE + 5)
+    ]
+
+    for snapshot in snapshots:
+        subscriber.offer(snapshot)
+
+    queued = [subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())]
+    assert queued == snapshots[5:]
+    assert queued[-1].run_id == f"run{_SUBSCRIBER_QUEUE_SIZE + 4}"
@@ -0,0 +1,240 @@
+"""Tests for the on-disk agent registry and run log."""
+
+from __future__ import annotations
+
+import orjson
+
+from app.authz import storage as auth_storage
+from app.trading import storage as trading_storage
+
+WALLET_A = "0x" + "a1" * 20
+WALLET_B = "0x" + "b2" * 20
+
+
+def _agent(index: int, **fields) -> dict:
+    return {"agent_address": f"0x{index:040x}", "label": f"Agent {index}", "key_cipher": "x", **fields}
+
+
+def _write_lines(path, records: list[dict]) -> None:
+    path.write_bytes(b"".join(orjson.dumps(record) + b"\n" for record in records))
+
+
+def test_migrate_legacy_owners_assigns_default_wallet_once(storage_dir) -> None:
+    _write_lines(auth_storage.agents_path(), [_agent(1), _agent(2, owner_wallet=WALLET_B)])
+
+    auth_storage.migrate_legacy_owners(WALLET_A)
+
+    assert [entry["agent_address"] for entry in auth_storage.agents_for_wallet(WALLET_A)] == [f"0x{1:040x}"]
+    assert (storage_dir / ".owners_migrated").exists()
+
+    # The sentinel makes later starts a no-op, whatever default they configure.
+    auth_storage.append_agent(_agent(3))
+    auth_storage.migrate_legacy_owners(WALLET_B)
+    assert auth_storage.get_agent(f"0x{3:040x}").get("owner_wallet") is None
+
+
+def test_unclaimed_agents_go_to_first_viewer_without_default(storage_dir) -> None:
+    _write_lines(auth_storage.agents_path(), [_agent(1)])
+
+    auth_storage.migrate_legacy_owners(None)
+    assert not (storage_dir / ".owners_migrated").exists()
+
+    assert [entry["agent_address"] for entry in auth_storage.agents_for_wallet(WALLET_A)] == [f"0x{1:040x}"]
+    assert auth_storage.agents_for_wallet(WALLET_B) == []
+    assert auth_storage.get_agent(f"0x{1:040x}")["owner_wallet"] == WALLET_A
+
+    # Nothing is left unclaimed, so the next start records the migration as done.
+    auth_storage.migrate_legacy_owners(None)
+    assert (storage_dir / ".owners_migrated").exists()
+
+
+def _addresses() -> list[str]:
+    return [entry["agent_address"] for entry in auth_storage.load_agents()]
+
+
+def test_agents_log_later_lines_win_and_tombstones_remove() -> None:
+    _write_lines(
+        auth_storage.agents_path(),
+        [
+            _agent(1),
+            _agent(2),
+            _agent(1, label="Renamed"),
+            {"op": "del", "agent_address": f"0x{2:040x}"},
+        ],
+    )
+
+    assert _addresses() == [f"0x{1:040x}"]
+    assert auth_storage.get_agent(f"0x{1:040x}")["label"] == "Renamed"
+    assert not auth_storage.has_agent(f"0x{2:040x}")
+
+    auth_storage.compact_agents()
+    assert auth_storage.agents_path().read_bytes().count(b"\n") == 1
+
+
+def test_agents_log_delete_then_register_again_survives_replay() -> None:
+    for index in range(1, 10):
+        assert auth_storage.register_agent(_agent(index, owner_wallet=WALLET_A))
+
+    # Two dead lines against eight live records is within the 25% allowance.
+    assert auth_storage.delete_agent(f"0x{1:040x}", WALLET_A)
+    assert b'"op":"del"' in auth_storage.agents_path().read_bytes()
+    assert auth_storage.register_agent(_agent(1, owner_wallet=WALLET_A, label="Back"))
+
+    auth_storage._AGENTS_CACHE = None  # force a replay from disk
+    assert len(auth_storage.load_agents()) == 9
+    assert auth_storage.get_agent(f"0x{1:040x}")["label"] == "Back"
+
+
+def test_agents_log_compacts_past_threshold() -> None:
+    for index in range(1, 10):
+        auth_storage.append_agent(_agent(index, owner_wallet=WALLET_A))
+
+    assert auth_storage.delete_agent(f"0x{1:040x}", WALLET_A)
+    assert auth_storage.delete_agent(f"0x{2:040x}", WALLET_A)
+
+    lines = [orjson.loads(line) for line in auth_storage.agents_path().read_bytes().splitlines()]
+    assert [line["agent_address"] for line in lines] == [f"0x{index:040x}" for index in range(3, 10)]
+    assert not any("op" in line for line in lines)
+
+
+def test_agents_log_skips_torn_trailing_line() -> None:
+    path = auth_storage.agents_path()
+    _write_lines(path, [_agent(1)])
+    with path.open("ab") as fh:
+        fh.write(b'{"agent_address":"0x')
+
+    assert _addresses() == [f"0x{1:040x}"]
+    auth_storage.append_agent(_agent(2))
+    auth_storage._AGENTS_CACHE = None
+    assert _addresses() == [f"0x{1:040x}", f"0x{2:040x}"]
+
+
+def test_legacy_agents_json_is_imported_once(storage_dir) -> None:
+    legacy_path = storage_dir / "agents.json"
+    legacy_path.write_bytes(orjson.dumps([_agent(1), _agent(2)]))
+
+    assert _addresses() == [f"0x{1:040x}", f"0x{2:040x}"]
+    assert not legacy_path.exists()
+    assert (storage_dir / "agents.json.bak").exists()
+    assert auth_storage.agents_path().read_bytes().count(b"\n") == 2
+
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _counting_fernet(monkeypatch) -> list[str]:
+    fernet = auth_storage.get_fernet()
+    decrypt = fernet.decrypt
+    calls: list[str] = []
+
+    def _decrypt(token: bytes) -> bytes:
+        calls.append(token.decode("utf-8"))
+        return decrypt(token)
+
+    monkeypatch.setattr(fernet, "decrypt", _decrypt)
+    return calls
+
+
+def test_decrypted_key_is_reused_until_it_expires(monkeypatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr(auth_storage.time, "monotonic", clock)
+    calls = _counting_fernet(monkeypatch)
+    cipher = auth_storage.get_fernet().encrypt(b"0x" + b"12" * 32).decode("utf-8")
+
+    assert auth_storage.decrypt_agent_key(cipher) == "0x" + "12" * 32
+    buffer = auth_storage._DECRYPTED_KEYS[cipher][1]
+    clock.now += auth_storage._DECRYPTED_KEY_TTL_SECONDS - 1
+    assert auth_storage.decrypt_agent_key(cipher) == "0x" + "12" * 32
+    assert len(calls) == 1
+
+    clock.now += 1
+    assert auth_storage.decrypt_agent_key(cipher) == "0x" + "12" * 32
+    assert len(calls) == 2
+    # The expired plaintext was overwritten before being dropped.
+    assert buffer == bytes(len(buffer))
+
+
+def test_delete_agent_clears_its_decrypted_key(monkeypatch) -> None:
+    calls = _counting_fernet(monkeypatch)
+    cipher = auth_storage.get_fernet().encrypt(b"0x" + b"34" * 32).decode("utf-8")
+    auth_storage.append_agent(_agent(1, key_cipher=cipher, owner_wallet=WALLET_A))
+
+    auth_storage.decrypt_agent_key(cipher)
+    buffer = auth_storage._DECRYPTED_KEYS[cipher][1]
+    assert auth_storage.delete_agent(f"0x{1:040x}", WALLET_A)
+
+    assert cipher not in auth_storage._DECRYPTED_KEYS
+    assert buffer == bytes(len(buffer))
+    auth_storage.decrypt_agent_key(cipher)
+    assert len(calls) == 2
+
+def _run(run_id: str, **fields) -> dict:
+    return {"run_id": run_id, "agent_address": "0x" + "beef" * 10, "status": "running", **fields}
+
+
+def _run_ids() -> list[str]:
+    return [entry["run_id"] for entry in trading_storage.load_runs()]
+
+
+def test_runs_log_replays_records_in_start_order_with_updates_applied() -> None:
+    _write_lines(
+        trading_storage.runs_path(),
+        [
+            _run("runA"),
+            _run("runB"),
+            {"op": "update", "run_id": "runA", "status": "closed"},
+            _run("runC"),
+            {"op": "update", "run_id": "runA", "closed_at": "later"},
+        ],
+    )
+
+    assert _run_ids() == ["runA", "runB", "runC"]
+    run_a = trading_storage.get_run("runA")
+    assert (run_a["status"], run_a["closed_at"]) == ("closed", "later")
+    assert trading_storage.active_agents() == {"0x" + "beef" * 10: "runB"}
+
+
+def test_runs_log_skips_torn_trailing_line_and_keeps_later_appends() -> None:
+    path = trading_storage.runs_path()
+    _write_lines(path, [_run("runA")])
+    with path.open("ab") as fh:
+        fh.write(b'{"run_id":"runB","sta')
+
+    assert _run_ids() == ["runA"]
+
+    trading_storage.append_run(_run("runC"))
+    trading_storage._INDEX = None  # force a replay from disk
+    assert _run_ids() == ["runA", "runC"]
+
+
+def test_runs_log_compaction_keeps_only_live_records() -> None:
+    for run_id in ("runA", "runB", "runC", "runD"):
+        trading_storage.append_run(_run(run_id))
+
+    trading_storage.update_run("runA", {"status": "closed"})
+    # One update line is within the 25% allowance, so it is appended.
+    assert len(trading_storage.runs_path().read_bytes().splitlines()) == 5
+
+    trading_storage.update_run("runB", {"status": "closed"})
+    lines = [orjson.loads(line) for line in trading_storage.runs_path().read_bytes().splitlines()]
+    assert [line["run_id"] for line in lines] == ["runA", "runB", "runC", "runD"]
+    assert not any("op" in line for line in lines)
+    assert [line["status"] for line in lines] == ["closed", "closed", "running", "running"]
+
+
+def test_get_runs_includes_staged_runs() -> None:
+    trading_storage.append_run(_run("runA"))
+    trading_storage.stage_run(_run("runB", status="starting"))
+    try:
+        runs = trading_storage.get_runs(["runA", "runB", "missing"])
+    finally:
+        trading_storage.discard_staged_run("runB")
+
+    assert sorted(runs) == ["runA", "runB"]
+    assert runs["runB"]["status"] == "starting"
@@ -2,54 +2,24 @@
 
 from __future__ import annotations
 
-import json
-from datetime import UTC, datetime
+import uuid
 
 import pytest
 from httpx import AsyncClient
 
-from app.authz import storage as auth_storage
-from app.trading import storage as trading_storage
-
-
-async def _register_agent(async_client: AsyncClient, wallet: str, agent_address: str, private_key: str) -> None:
-    await async_client.post("/authz/session", json={"address": wallet})
-    response = await async_client.post(
-        "/authz/agent",
-        json={
-            "label": "Withdraw",
-            "agent_address": agent_address,
-            "private_key": private_key,
-        },
-    )
-    assert response.status_code == 200
-
-
-def _seed_run(run_id: str, wallet: str, agent_address: str) -> None:
-    trading_storage.append_run(
-        {
-            "run_id": run_id,
-            "market": "ETH-PERP",
-            "usd_notional": "250",
-            "leverage": 3,
-            "wallet_address": wallet,
-            "agent_address": agent_address,
-            "status": "running",
-            "started_at": datetime.now(tz=UTC).isoformat(),
-            "duration_minutes": 30,
-        }
-    )
 
 
 @pytest.mark.asyncio
-async def test_withdraw_prepare_returns_typed_data(monkeypatch, async_client: AsyncClient) -> None:
+async def test_withdraw_prepare_returns_typed_data(
+    monkeypatch, async_client: AsyncClient, register_agent, seed_run, audit_tail
+) -> None:
     wallet = "0x" + "c0de" * 10
     agent_address = "0x" + "face" * 10
     private_key = "0x" + "f00d" * 16
 
-    await _register_agent(async_client, wallet, agent_address, private_key)
-    run_id = "run" + datetime.now(tz=UTC).strftime("%H%M%S%f")
-    _seed_run(run_id, wallet, agent_address)
+    await register_agent(wallet, agent_address, private_key, label="Withdraw")
+    run_id = "run" + uuid.uuid4().hex[:12]
+    seed_run(run_id, wallet, agent_address, usd_notional="250")
 
     payload = {
         "run_id": run_id,
@@ -79,7 +49,7 @@ async def test_withdraw_prepare_returns_typed_data(monkeypatch, async_client: As
     assert message["amount"] == "150.75"
     assert isinstance(message["nonce"], int)
 
-    audit_entries = [json.loads(line) for line in auth_storage.audit_log_path().read_text(encoding="utf-8").splitlines() if line]
+    audit_entries = audit_tail(run_id=run_id)
     entry = next(e for e in audit_entries if e.get("action") == "withdraw_prepare" and e.get("run_id") == run_id)
     assert entry["typed_data"]["message"]["amount"] == "150.75"
     assert entry["payload"]["amount_usd"] == "150.75"